@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+調試腳本：一次執行所有頁面分析
+
+以 asyncio 版 Playwright 啟動單一瀏覽器與共用的 context (Cookies、HTTP 快取)，
+在三個分頁中同時執行：
+- debug_find_posts.py     : 貼文容器 + role="article" 分析
+- debug_page_structure.py : article 結構 (按鈕、div[dir="auto"])
+- find_real_posts.py      : 長文本元素搜尋
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from playwright.async_api import async_playwright
+
+from config import Config
+from debug_find_posts import (
+    POSSIBLE_CONTAINERS, CONTAINER_COUNT_JS, ARTICLE_SUMMARY_JS,
+    print_containers, print_articles,
+)
+from debug_page_structure import ARTICLE_STRUCTURE_JS, print_structure
+from find_real_posts import TEXT_ELEMENTS_JS, print_candidates
+
+
+async def analyze_containers(page):
+    """策略 1 + 2: 貼文容器與 role="article" 分析"""
+    counts = await page.evaluate(CONTAINER_COUNT_JS, POSSIBLE_CONTAINERS)
+    data = await page.locator('[role="article"]').evaluate_all(ARTICLE_SUMMARY_JS)
+    return counts, data
+
+
+async def analyze_structure(page):
+    """article 結構分析"""
+    return await page.locator('[role="article"]').evaluate_all(ARTICLE_STRUCTURE_JS)
+
+
+async def find_real_posts(page):
+    """長文本元素搜尋"""
+    return await page.evaluate(TEXT_ELEMENTS_JS)
+
+
+async def run(config):
+    async with async_playwright() as p:
+        print("\n1. 啟動瀏覽器...")
+        browser = await p.chromium.launch(
+            headless=False,
+            args=['--disable-blink-features=AutomationControlled'],
+        )
+
+        try:
+            print("2. 載入 Cookies...")
+            context = await browser.new_context(
+                storage_state='config/auth.json',
+                user_agent=config.user_agent,
+                viewport={'width': 1280, 'height': 720},
+                locale='zh-TW',
+            )
+
+            print("3. 在 3 個分頁同時前往社團頁面...")
+            pages = await asyncio.gather(*(context.new_page() for _ in range(3)))
+            await asyncio.gather(*(
+                page.goto(config.group_url, wait_until='domcontentloaded', timeout=90000)
+                for page in pages
+            ))
+
+            print("\n✅ 頁面已載入，同時執行所有分析...")
+            (counts, articles), structure, candidates = await asyncio.gather(
+                analyze_containers(pages[0]),
+                analyze_structure(pages[1]),
+                find_real_posts(pages[2]),
+            )
+
+        finally:
+            await browser.close()
+
+    # 依序印出結果，避免輸出交錯
+    print("\n📦 策略 1: 尋找貼文容器")
+    print("-" * 60)
+    print_containers(counts)
+
+    print("\n\n📊 策略 2: 分析所有 role='article' 元素")
+    print("-" * 60)
+    print_articles(articles)
+
+    print("\n\n🧱 article 結構分析")
+    print("-" * 60)
+    print_structure(structure)
+
+    print("\n\n🔍 長文本元素")
+    print("-" * 60)
+    print_candidates(candidates)
+
+
+def main():
+    print("🔍 Facebook 頁面完整分析 (並行)")
+    print("=" * 60)
+
+    config = Config('config/config.json')
+
+    try:
+        asyncio.run(run(config))
+        print("\n" + "=" * 60)
+        print("✅ 分析完成！")
+        print("=" * 60)
+
+    except Exception as e:
+        print(f"\n❌ 錯誤: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,7 @@
 調試腳本：分析 Facebook 群組頁面結構
 """
 
+import base64
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
@@ -10,6 +11,59 @@ sys.path.insert(0, str(Path(__file__).parent / 'src'))
 from config import Config
 from logger import ScraperLogger
 from browser import BrowserController
+from debug_utils import open_group_page, save_snapshot
+
+# 在瀏覽器內一次收集前 5 個 role="article" 元素的結構資訊
+# (以 page.locator('[role="article"]').evaluate_all 執行，all 為所有 article 元素)
+ARTICLE_STRUCTURE_JS = """(all) => {
+    const articles = all.slice(0, 5).map(a => {
+        const buttons = a.querySelectorAll('div[role="button"]');
+        const divs = a.querySelectorAll('div[dir="auto"]');
+        const text = a.innerText || '';
+        return {
+            textLen: text.length,
+            textPreview: text.slice(0, 200),
+            buttonCount: buttons.length,
+            buttons: Array.from(buttons).slice(0, 10).map(b => (b.innerText || '').trim()),
+            divCount: divs.length,
+            divs: Array.from(divs).slice(0, 5).map(d => (d.innerText || '').trim())
+        };
+    });
+    return {total: all.length, articles: articles};
+}"""
+
+# 前 5 個 article 在文件座標中的位置 (供 CDP clip 截圖)
+ARTICLE_RECTS_JS = """(all) => all.slice(0, 5).map(e => {
+    const r = e.getBoundingClientRect();
+    return {x: r.x + window.scrollX, y: r.y + window.scrollY, width: r.width, height: r.height};
+})"""
+
+
+def print_structure(data):
+    """印出每個 article 的文本、按鈕與 div[dir="auto"] 分析結果"""
+    print(f"\n📊 找到 {data['total']} 個 [role='article'] 元素\n")
+
+    for i, info in enumerate(data['articles'], 1):  # 只分析前 5 個
+        print(f"\n{'='*60}")
+        print(f"元素 #{i}")
+        print(f"{'='*60}")
+
+        # 獲取文本
+        print(f"📝 完整文本 ({info['textLen']} 字元):")
+        print(f"   {info['textPreview']}...")
+
+        # 檢查是否有「查看更多」
+        print(f"\n🔘 找到 {info['buttonCount']} 個按鈕:")
+        for j, btn_text in enumerate(info['buttons'], 1):  # 只顯示前 10 個
+            if btn_text:
+                print(f"   按鈕 {j}: '{btn_text[:50]}'")
+
+        # 檢查 div[dir="auto"]
+        print(f"\n📄 找到 {info['divCount']} 個 div[dir='auto']:")
+        for j, div_text in enumerate(info['divs'], 1):  # 只顯示前 5 個
+            if len(div_text) > 10:
+                print(f"   Div {j} ({len(div_text)} 字元): {div_text[:80]}...")
+
 
 def main():
     print("🔍 Facebook 頁面結構分析工具")
@@ -21,58 +75,31 @@ def main():
     browser = BrowserController(config, logger)
 
     try:
-        # 啟動瀏覽器
-        print("\n1. 啟動瀏覽器...")
-        browser.launch(headless=False)
-
-        # 建立 context
-        print("2. 載入 Cookies...")
-        browser.create_context(cookies_path='config/auth.json')
-
-        # 導航
-        print("3. 前往社團頁面...")
-        browser.goto(config.group_url)
+        # 啟動瀏覽器並開啟社團頁面 (或重播快照)
+        page = open_group_page(browser, config)
+        save_snapshot(page)
 
         print("\n✅ 頁面已載入，現在開始分析...")
         print("-" * 60)
 
         # 分析頁面結構
-        page = browser.page
-
-        # 找所有 article 元素
-        articles = page.query_selector_all('[role="article"]')
-        print(f"\n📊 找到 {len(articles)} 個 [role='article'] 元素\n")
-
-        for i, article in enumerate(articles[:5], 1):  # 只分析前 5 個
-            print(f"\n{'='*60}")
-            print(f"元素 #{i}")
-            print(f"{'='*60}")
-
-            # 獲取文本
-            full_text = article.inner_text()
-            print(f"📝 完整文本 ({len(full_text)} 字元):")
-            print(f"   {full_text[:200]}...")
-
-            # 檢查是否有「查看更多」
-            buttons = article.query_selector_all('div[role="button"]')
-            print(f"\n🔘 找到 {len(buttons)} 個按鈕:")
-            for j, btn in enumerate(buttons[:10], 1):  # 只顯示前 10 個
-                btn_text = btn.inner_text().strip()
-                if btn_text:
-                    print(f"   按鈕 {j}: '{btn_text[:50]}'")
-
-            # 檢查 div[dir="auto"]
-            divs = article.query_selector_all('div[dir="auto"]')
-            print(f"\n📄 找到 {len(divs)} 個 div[dir='auto']:")
-            for j, div in enumerate(divs[:5], 1):  # 只顯示前 5 個
-                div_text = div.inner_text().strip()
-                if len(div_text) > 10:
-                    print(f"   Div {j} ({len(div_text)} 字元): {div_text[:80]}...")
-
-            # 截圖
+        # 一次 evaluate_all 取得所有 article 的文本、按鈕與 div[dir="auto"]
+        articles = page.locator('[role="article"]')
+        data = articles.evaluate_all(ARTICLE_STRUCTURE_JS)
+        print_structure(data)
+
+        # 截圖：一次取得所有 article 的位置，再用 CDP clip 直接擷取
+        rects = articles.evaluate_all(ARTICLE_RECTS_JS)
+        cdp = page.context.new_cdp_session(page)
+        for i, rect in enumerate(rects, 1):
             screenshot_path = f"logs/debug_article_{i}.png"
             try:
-                article.screenshot(path=screenshot_path)
+                shot = cdp.send('Page.captureScreenshot', {
+                    'format': 'png',
+                    'clip': {**rect, 'scale': 1},
+                    'captureBeyondViewport': True,
+                })
+                Path(screenshot_path).write_bytes(base64.b64decode(shot['data']))
                 print(f"\n📸 截圖已儲存: {screenshot_path}")
             except Exception as e:
                 print(f"\n⚠️ 截圖失敗: {e}")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+調試腳本共用工具
+
+設定環境變數 DEBUG_REPLAY=1 時，調試腳本不會連線到 Facebook，
+而是載入上次執行時儲存的頁面快照 (logs/page_snapshot.html)，
+讓選擇器調整可以離線、快速地反覆測試。
+"""
+
+import os
+from pathlib import Path
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+# 頁面快照 (上次實際載入的 DOM)
+SNAPSHOT_PATH = Path('logs/page_snapshot.html')
+
+# 是否使用快照重播模式
+REPLAY = bool(os.getenv('DEBUG_REPLAY'))
+
+# role="article" 數量連續兩次取樣相同 (且 > 0) 時視為載入完成
+ARTICLES_STABLE_JS = """() => {
+    const n = document.querySelectorAll('[role="article"]').length;
+    const stable = n > 0 && n === window.__debugArticleCount;
+    window.__debugArticleCount = n;
+    return stable;
+}"""
+
+
+def scroll_and_wait(page, script: str, timeout: int = 5000) -> bool:
+    """
+    執行滾動腳本，並等待 article 數量穩定 (取代固定的 time.sleep)
+
+    Args:
+        page: Playwright Page 物件
+        script (str): 滾動用的 JavaScript (e.g., 'window.scrollBy(0, 500)')
+        timeout (int): 最長等待時間 (毫秒)
+
+    Returns:
+        bool: 是否在時間內穩定
+    """
+    page.evaluate(f"() => {{ {script}; window.__debugArticleCount = -1; }}")
+    try:
+        page.wait_for_function(ARTICLES_STABLE_JS, polling=250, timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+def open_group_page(browser, config):
+    """
+    啟動瀏覽器並開啟社團頁面 (重播模式下改為載入快照)
+
+    Args:
+        browser: BrowserController 物件
+        config: Config 物件
+
+    Returns:
+        Page: Playwright Page 物件
+    """
+    print("\n1. 啟動瀏覽器...")
+    browser.launch(headless=False)
+
+    if REPLAY:
+        print(f"2. 重播模式：載入頁面快照 {SNAPSHOT_PATH}")
+        browser.create_context()
+        page = browser.page
+        # 阻擋所有網路請求，只使用快照中的 DOM
+        page.route('**/*', lambda route: route.abort())
+        page.set_content(SNAPSHOT_PATH.read_text(encoding='utf-8'))
+        return page
+
+    print("2. 載入 Cookies...")
+    browser.create_context(cookies_path='config/auth.json')
+
+    print("3. 前往社團頁面...")
+    browser.goto(config.group_url)
+
+    return browser.page
+
+
+def save_snapshot(page):
+    """
+    儲存目前頁面的 DOM 快照 (重播模式下略過)
+
+    Args:
+        page: Playwright Page 物件
+    """
+    if REPLAY:
+        return
+
+    SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    SNAPSHOT_PATH.write_text(page.content(), encoding='utf-8')
+    print(f"💾 頁面快照已儲存: {SNAPSHOT_PATH} (設定 DEBUG_REPLAY=1 可離線重播)")
@@ -3,14 +3,110 @@
 終極調試：使用 JavaScript 在瀏覽器中尋找真正的貼文
 """
 
+import json
 import sys
-import time
+from operator import itemgetter
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
 from config import Config
 from logger import ScraperLogger
 from browser import BrowserController
+from debug_utils import open_group_page, save_snapshot, scroll_and_wait
+
+# 使用 JavaScript 找到所有包含長文本（>20字元）的元素
+TEXT_ELEMENTS_JS = """() => {
+    const MIN_TEXT_LENGTH = 20;  // 降低門檻
+    const results = [];
+
+    // 已接受的元素 → 文本長度，用來略過只是包一層的子元素
+    const accepted = new Map();
+
+    // 單次 TreeWalker 遍歷所有元素
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_ELEMENT);
+    let node;
+    while ((node = walker.nextNode())) {
+        // 先用 textContent 快速過濾（不觸發 layout）
+        if ((node.textContent || '').length <= MIN_TEXT_LENGTH) continue;
+
+        // 只對通過的元素計算 innerText
+        const allText = node.innerText || '';
+        if (allText.length <= MIN_TEXT_LENGTH) continue;
+
+        // 父元素已回報相同文本時跳過（同一則貼文的內層 span/div）
+        const parent = node.parentElement;
+        if (parent && accepted.get(parent) === allText.length) {
+            accepted.set(node, allText.length);
+            continue;
+        }
+        accepted.set(node, allText.length);
+
+        // 計算距離 body 的深度
+        let depth = 0;
+        for (let c = node; c && c !== document.body; c = c.parentElement) depth++;
+
+        // 找到貼文的永久連結
+        const permalink = node.querySelector('a[href*="/posts/"], a[href*="/permalink/"]');
+
+        results.push({
+            tagName: node.tagName,
+            className: node.className || '',
+            id: node.id || '',
+            textLength: allText.length,
+            textPreview: allText.substring(0, 150),
+            hasPermalink: !!permalink,
+            permalinkHref: permalink ? permalink.href : '',
+            role: node.getAttribute('role') || '',
+            depth: depth
+        });
+    }
+
+    // 按文本長度排序，最長的在前面
+    results.sort((a, b) => b.textLength - a.textLength);
+
+    return results.slice(0, 30);  // 返回前30個
+}"""
+
+
+def print_candidates(result):
+    """印出可能的貼文元素"""
+    print(f"找到 {len(result)} 個可能的貼文元素：\n")
+
+    for i, elem in enumerate(result, 1):
+        print(f"{'─'*60}")
+        print(f"元素 #{i}")
+        print(f"{'─'*60}")
+        print(f"標籤: <{elem['tagName'].lower()}>")
+        print(f"Class: {elem['className'][:100]}...")
+        print(f"ID: {elem['id']}")
+        print(f"Role: {elem['role']}")
+        print(f"深度: {elem['depth']}")
+        print(f"文本長度: {elem['textLength']} 字元")
+        print(f"有永久連結: {'✅' if elem['hasPermalink'] else '❌'}")
+        if elem['hasPermalink']:
+            print(f"連結: {elem['permalinkHref'][:80]}...")
+        print(f"\n文本預覽:")
+        print(f"  {elem['textPreview']}...\n")
+
+
+def select_post_candidates(result, min_length=200):
+    """
+    篩選最可能是主貼文的元素：role="article"、有永久連結、文本夠長
+
+    Args:
+        result (list): TEXT_ELEMENTS_JS 的回傳結果
+        min_length (int): 最短文本長度
+
+    Returns:
+        list: 依文本長度排序 (長到短) 的候選元素
+    """
+    candidates = [
+        elem for elem in result
+        if elem['hasPermalink'] and elem['textLength'] > min_length and elem['role'] == 'article'
+    ]
+    candidates.sort(key=itemgetter('textLength'), reverse=True)
+    return candidates
+
 
 def main():
     print("🔍 尋找真正的貼文元素")
@@ -21,100 +117,30 @@ def main():
     browser = BrowserController(config, logger)
 
     try:
-        print("\n1. 啟動瀏覽器...")
-        browser.launch(headless=False)
-
-        print("2. 載入 Cookies...")
-        browser.create_context(cookies_path='config/auth.json')
-
-        print("3. 前往社團頁面...")
-        browser.goto(config.group_url)
-
-        page = browser.page
+        page = open_group_page(browser, config)
 
         print("\n4. 滾動到頁面頂部...")
-        page.evaluate("window.scrollTo(0, 0)")
-        time.sleep(2)
+        scroll_and_wait(page, "window.scrollTo(0, 0)")
 
         print("5. 稍微滾動以觸發內容載入...")
-        page.evaluate("window.scrollBy(0, 500)")
-        time.sleep(2)
-        page.evaluate("window.scrollBy(0, -500)")
-        time.sleep(2)
+        scroll_and_wait(page, "window.scrollBy(0, 500)")
+        scroll_and_wait(page, "window.scrollBy(0, -500)")
+        save_snapshot(page)
 
         print("\n✅ 開始分析...\n")
         print("="*60)
 
-        # 使用 JavaScript 找到所有包含長文本（>20字元）的元素
-        result = page.evaluate("""() => {
-            const MIN_TEXT_LENGTH = 20;  // 降低門檻
-            const results = [];
-
-            // 遍歷所有元素
-            function findTextElements(element, depth = 0) {
-                if (depth > 15) return;  // 限制深度
-
-                // 獲取直接文本（不包括子元素）
-                const directText = Array.from(element.childNodes)
-                    .filter(node => node.nodeType === Node.TEXT_NODE)
-                    .map(node => node.textContent.trim())
-                    .join(' ');
-
-                // 獲取所有文本（包括子元素）
-                const allText = element.innerText || '';
-
-                // 如果這個元素有足夠長的文本
-                if (allText.length > MIN_TEXT_LENGTH) {
-                    // 找到貼文的永久連結
-                    const permalink = element.querySelector('a[href*="/posts/"], a[href*="/permalink/"]');
-
-                    results.push({
-                        tagName: element.tagName,
-                        className: element.className || '',
-                        id: element.id || '',
-                        textLength: allText.length,
-                        textPreview: allText.substring(0, 150),
-                        hasPermalink: !!permalink,
-                        permalinkHref: permalink ? permalink.href : '',
-                        role: element.getAttribute('role') || '',
-                        depth: depth
-                    });
-                }
-
-                // 遞迴處理子元素（但跳過已經找到的）
-                if (allText.length < MIN_TEXT_LENGTH * 2) {
-                    Array.from(element.children).forEach(child => {
-                        findTextElements(child, depth + 1);
-                    });
-                }
-            }
-
-            // 從 body 開始搜索
-            findTextElements(document.body);
-
-            // 按文本長度排序，最長的在前面
-            results.sort((a, b) => b.textLength - a.textLength);
-
-            return results.slice(0, 30);  // 返回前30個
-        }""")
-
-        print(f"找到 {len(result)} 個可能的貼文元素：\n")
-
-        for i, elem in enumerate(result, 1):
-            print(f"{'─'*60}")
-            print(f"元素 #{i}")
-            print(f"{'─'*60}")
-            print(f"標籤: <{elem['tagName'].lower()}>")
-            print(f"Class: {elem['className'][:100]}...")
-            print(f"ID: {elem['id']}")
-            print(f"Role: {elem['role']}")
-            print(f"深度: {elem['depth']}")
-            print(f"文本長度: {elem['textLength']} 字元")
-            print(f"有永久連結: {'✅' if elem['hasPermalink'] else '❌'}")
-            if elem['hasPermalink']:
-                print(f"連結: {elem['permalinkHref'][:80]}...")
-            print(f"\n文本預覽:")
-            print(f"  {elem['textPreview']}...\n")
+        result = page.evaluate(TEXT_ELEMENTS_JS)
+
+        print_candidates(result)
+
+        # 篩選候選貼文並儲存，供後續調整選擇器使用
+        candidates = select_post_candidates(result)
+        candidates_path = Path('logs/candidates.json')
+        candidates_path.write_text(
+            json.dumps(candidates, ensure_ascii=False, indent=2), encoding='utf-8'
+        )
+        print(f"🎯 {len(candidates)} 個候選貼文已儲存: {candidates_path}")
 
         print("="*60)
         print("✅ 分析完成！")
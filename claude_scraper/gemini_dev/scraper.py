@@ -11,6 +11,11 @@ import os
 import json
 from pathlib import Path
 
+try:
+    import orjson  # Optional: parses straight from UTF-8 bytes, much faster for large snapshots
+except ImportError:
+    orjson = None
+
 # Add src directory to Python path
 project_root = Path(__file__).parent
 src_path = project_root / 'src'
@@ -55,6 +60,26 @@ def process_snapshot(snapshot_data: dict, logger: ScraperLogger):
     # print(json.dumps(snapshot_data, indent=2))
 
 
+def load_snapshot(snapshot_file: Path) -> dict:
+    """
+    Loads a snapshot file, parsing directly from bytes.
+
+    Args:
+        snapshot_file (Path): Path to the snapshot JSON file.
+
+    Returns:
+        dict: The parsed snapshot data.
+
+    Raises:
+        json.JSONDecodeError: If the file is not valid JSON
+            (orjson.JSONDecodeError is a subclass of it).
+    """
+    raw = snapshot_file.read_bytes()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 def main():
     """
     Main function to run the scraper processor.
@@ -82,8 +107,7 @@ def main():
         sys.exit(1)
     
     try:
-        with open(snapshot_file, 'r', encoding='utf-8') as f:
-            snapshot_data = json.load(f)
+        snapshot_data = load_snapshot(snapshot_file)
         logger.info("Snapshot file loaded successfully.")
     except json.JSONDecodeError as e:
         logger.error(f"Failed to parse snapshot JSON: {e}", exc_info=True)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Playwright 效能修補
+
+Playwright 的每一次呼叫 (evaluate、query_selector、click ...)
+都會執行 inspect.stack() 與 traceback.extract_stack() 來記錄呼叫堆疊，
+這些資訊只用於錯誤訊息與 trace，但在滾動/提取迴圈中佔用大量 CPU。
+
+- sync API: playwright._impl._sync_base 在每次呼叫時記錄堆疊
+- async API (sync API 底層也是): playwright._impl._connection 的
+  wrap_api_call 以 inspect.stack() 取得呼叫者資訊
+
+匯入此模組即會把上述模組內的 inspect / traceback 換成輕量代理，
+讓這些呼叫直接返回空堆疊 (錯誤訊息與 trace 中不再有呼叫位置)。
+
+設定環境變數 PW_INSPECT_STACK=1 可停用修補 (保留完整堆疊以便除錯)。
+"""
+
+import inspect
+import os
+import traceback
+
+
+class _ModuleProxy:
+    """轉發到原模組的代理，只覆蓋指定的函式"""
+
+    def __init__(self, module, **overrides):
+        self._module = module
+        self.__dict__.update(overrides)
+
+    def __getattr__(self, name):
+        return getattr(self._module, name)
+
+
+def _empty_stack(*args, **kwargs):
+    return []
+
+
+def _empty_stack_summary(*args, **kwargs):
+    return traceback.StackSummary()
+
+
+def apply() -> bool:
+    """
+    套用修補
+
+    Returns:
+        bool: 是否已套用 (PW_INSPECT_STACK=1 或 Playwright 版本不符時為 False)
+    """
+    if os.environ.get('PW_INSPECT_STACK', '0') == '1':
+        return False
+
+    try:
+        from playwright._impl import _connection, _sync_base
+    except ImportError:
+        return False
+
+    patched = False
+    for module in (_sync_base, _connection):
+        patched = _patch_module(module) or patched
+    return patched
+
+
+def _patch_module(module) -> bool:
+    """
+    替換模組內的 inspect / traceback (模組沒有使用時略過)
+
+    Args:
+        module: playwright._impl 內的模組
+
+    Returns:
+        bool: 是否已套用
+    """
+    if isinstance(getattr(module, 'inspect', None), _ModuleProxy):
+        return True  # 已套用
+
+    if not hasattr(module, 'inspect'):
+        return False
+
+    module.inspect = _ModuleProxy(inspect, stack=_empty_stack)
+    if hasattr(module, 'traceback'):
+        module.traceback = _ModuleProxy(traceback, extract_stack=_empty_stack_summary)
+    return True
+
+
+PATCHED = apply()
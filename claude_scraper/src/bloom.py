@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Bloom filter 模組
+
+提供已處理貼文 ID 的快速成員檢查：
+- BloomFilter: 固定容量的 Bloom filter (bytearray 位元陣列)
+- ScalableBloomFilter: 容量用完時自動加掛新的 filter，整體誤判率維持在上限內
+- StableBloomFilter: 固定記憶體，逐漸淡忘舊元素 (長時間執行時使用)
+
+Bloom filter 只會誤判「可能存在」，不會漏判；回答「可能存在」時
+應以精確集合確認 (見 StateManager.is_processed)。
+"""
+
+import hashlib
+import math
+import random
+
+
+def _hash_positions(key: str, num_hashes: int, m: int):
+    """以 double hashing 由一次 blake2b 產生 k 個位元位置"""
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], 'little')
+    h2 = int.from_bytes(digest[8:], 'little') | 1
+    return [(h1 + i * h2) % m for i in range(num_hashes)]
+
+
+class BloomFilter:
+    """
+    固定容量的 Bloom filter
+
+    使用方式:
+        bloom = BloomFilter(capacity=100000, error_rate=1e-7)
+        bloom.add('post_123')
+        'post_123' in bloom  # True
+        'post_456' in bloom  # False (極低機率為 True)
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        初始化 Bloom filter
+
+        Args:
+            capacity (int): 預計容納的元素數量
+            error_rate (float): 容納 capacity 個元素時的誤判率上限
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        # 最佳位元數 m = -n ln(p) / (ln 2)^2，雜湊數 k = m/n ln 2
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        return _hash_positions(key, self.num_hashes, self.num_bits)
+
+    def add(self, key: str) -> bool:
+        """
+        加入元素
+
+        Args:
+            key (str): 元素
+
+        Returns:
+            bool: 元素是否 (可能) 已存在
+        """
+        bits = self.bits
+        existed = True
+        for pos in self._positions(key):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                existed = False
+                bits[byte] |= mask
+
+        if not existed:
+            self.count += 1
+        return existed
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        for pos in self._positions(key):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class ScalableBloomFilter:
+    """
+    可擴充的 Bloom filter
+
+    目前的 filter 滿載時加掛容量加倍、誤判率減半的新 filter，
+    總誤判率不超過 error_rate (等比級數和)。
+
+    使用方式:
+        bloom = ScalableBloomFilter(initial_capacity=100000, error_rate=1e-7)
+        for post_id in ids:
+            bloom.add(post_id)
+    """
+
+    # 每個新 filter 的容量倍數與誤判率縮減比例
+    GROWTH = 2
+    TIGHTENING = 0.5
+
+    def __init__(self, initial_capacity: int = 100000, error_rate: float = 1e-7):
+        """
+        初始化可擴充的 Bloom filter
+
+        Args:
+            initial_capacity (int): 第一個 filter 的容量
+            error_rate (float): 總誤判率上限
+        """
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.filters = []
+
+        # 外部記錄用：已加入的來源清單長度 (StateManager 以此判斷是否需要補齊)
+        self.synced = 0
+
+    def add(self, key: str) -> bool:
+        """
+        加入元素
+
+        Args:
+            key (str): 元素
+
+        Returns:
+            bool: 元素是否 (可能) 已存在
+        """
+        if key in self:
+            return True
+
+        if not self.filters or self.filters[-1].count >= self.filters[-1].capacity:
+            n = len(self.filters)
+            self.filters.append(BloomFilter(
+                self.initial_capacity * (self.GROWTH ** n),
+                self.error_rate * (1 - self.TIGHTENING) * (self.TIGHTENING ** n)
+            ))
+
+        self.filters[-1].add(key)
+        return False
+
+    def __contains__(self, key: str) -> bool:
+        # 最新的 filter 最大，先檢查
+        for bloom in reversed(self.filters):
+            if key in bloom:
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return sum(bloom.count for bloom in self.filters)
+
+
+class StableBloomFilter:
+    """
+    Stable Bloom filter (Deng & Rafiei, 2006)
+
+    每次加入元素前先隨機清除 p 個位元，再設定 k 個雜湊位置；
+    舊元素逐漸被淡忘，記憶體固定 (num_bits / 8 bytes)，不隨元素數增加。
+    清除與設定達到平衡後，誤判率穩定在 error_rate 附近。
+
+    代價: 很久以前加入的元素可能被漏判 (平均約 num_bits / p 次加入後淡忘)；
+    誤判 (約 error_rate) 則無法以精確集合排除，新元素會被當成已存在。
+    因此只適合「偶爾重複處理舊貼文、偶爾漏掉新貼文也沒關係」的長時間執行。
+
+    使用方式:
+        bloom = StableBloomFilter(num_bits=2**23, num_hashes=7, error_rate=1e-4)
+        bloom.add('post_123')
+        'post_123' in bloom  # True (近期加入的元素)
+    """
+
+    def __init__(self, num_bits: int = 2 ** 23, num_hashes: int = 7, error_rate: float = 1e-4):
+        """
+        初始化 Stable Bloom filter
+
+        Args:
+            num_bits (int): 位元數 (固定記憶體)
+            num_hashes (int): 雜湊數 k
+            error_rate (float): 穩定狀態的誤判率，用來決定每次清除的位元數 p
+        """
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.error_rate = error_rate
+
+        # 穩定狀態的 0 比例 z = 1 / (1 + 1 / (p (1/k - 1/m)))，誤判率 = (1 - z)^k
+        zero_ratio = 1 - error_rate ** (1 / num_hashes)
+        self.decrement = max(1, math.ceil(
+            zero_ratio / (1 - zero_ratio) / (1 / num_hashes - 1 / num_bits)
+        ))
+
+        self.bits = bytearray((num_bits + 7) // 8)
+        self.count = 0
+        self._rng = random.Random()
+
+        # 外部記錄用：已加入的來源清單長度 (StateManager 以此判斷是否需要補齊)
+        self.synced = 0
+
+    def _positions(self, key: str):
+        return _hash_positions(key, self.num_hashes, self.num_bits)
+
+    def add(self, key: str) -> bool:
+        """
+        加入元素 (先清除 p 個隨機位置開始的連續位元)
+
+        Args:
+            key (str): 元素
+
+        Returns:
+            bool: 元素是否 (可能) 已存在
+        """
+        bits = self.bits
+        existed = key in self
+
+        # 論文建議的做法: 隨機起點後的 p 個連續位置，效果與 p 個獨立隨機位置相同
+        start = self._rng.randrange(self.num_bits)
+        for i in range(self.decrement):
+            pos = (start + i) % self.num_bits
+            bits[pos >> 3] &= ~(1 << (pos & 7))
+
+        for pos in self._positions(key):
+            bits[pos >> 3] |= 1 << (pos & 7)
+
+        if not existed:
+            self.count += 1
+        return existed
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        for pos in self._positions(key):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return self.count
+
+
+# 測試程式碼
+if __name__ == '__main__':
+    import time
+
+    print("測試 ScalableBloomFilter...")
+
+    bloom = ScalableBloomFilter(initial_capacity=1000, error_rate=1e-4)
+
+    start = time.perf_counter()
+    for i in range(10000):
+        bloom.add(f'post_{i}')
+    elapsed = time.perf_counter() - start
+    print(f"✅ 加入 10000 個元素: {elapsed:.3f} 秒，{len(bloom.filters)} 個 filter")
+
+    assert all(f'post_{i}' in bloom for i in range(10000))
+    print("✅ 沒有漏判")
+
+    false_positives = sum(f'other_{i}' in bloom for i in range(100000))
+    print(f"✅ 誤判: {false_positives} / 100000 (預期約 {1e-4 * 100000:.0f})")
+
+    print("\n測試 StableBloomFilter...")
+
+    stable = StableBloomFilter(num_bits=2 ** 16, num_hashes=7, error_rate=1e-3)
+    for i in range(100000):
+        stable.add(f'post_{i}')
+    print(f"✅ 加入 100000 個元素，記憶體固定 {len(stable.bits)} bytes，每次清除 {stable.decrement} 個位元")
+
+    recent = sum(f'post_{i}' in stable for i in range(99900, 100000))
+    assert recent >= 80
+    print(f"✅ 最近加入的 100 個元素找到 {recent} 個 (較舊的逐漸淡忘)")
+
+    false_positives = sum(f'other_{i}' in stable for i in range(100000))
+    print(f"✅ 誤判: {false_positives} / 100000 (預期約 {1e-3 * 100000:.0f})")
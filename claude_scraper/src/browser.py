@@ -10,11 +10,378 @@
 - 元素查找
 """
 
+import asyncio
+import atexit
 import time
 import random
 from pathlib import Path
 from typing import Optional, List
+
+import _patch_playwright  # noqa: F401  移除每次 Playwright 呼叫的 inspect.stack() 開銷
 from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import async_playwright
+from playwright.async_api import TimeoutError as AsyncTimeoutError
+
+# Chromium 啟動參數 (反檢測)
+_LAUNCH_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+    '--disable-web-security',
+    '--disable-features=IsolateOrigins,site-per-process',
+    '--disable-site-isolation-trials',
+]
+
+# 只抓取 DOM 時用不到的 Chromium 功能 (GPU、WebGL、背景網路等)，關閉以降低記憶體；
+# 並限制每個分頁的 V8 heap，搭配 context 重建讓長時間執行的記憶體維持在固定範圍
+_LEAN_ARGS = [
+    '--disable-gpu',
+    '--disable-webgl',
+    '--disable-accelerated-2d-canvas',
+    '--disable-mipmap-generation',
+    '--disable-partial-raster',
+    '--no-zygote',
+    '--disable-background-networking',
+    '--disable-renderer-backgrounding',
+    '--mute-audio',
+    '--disable-extensions',
+    '--js-flags=--max-old-space-size=512',
+]
+
+
+def _launch_args(config) -> List[str]:
+    """
+    取得 Chromium 啟動參數
+
+    Args:
+        config: Config 物件 (need_rendering 為 True 時保留 GPU 等渲染功能)
+
+    Returns:
+        List[str]: 啟動參數
+    """
+    if config.need_rendering:
+        return _LAUNCH_ARGS
+    return _LAUNCH_ARGS + _LEAN_ARGS
+
+
+# 已確認存在的目錄 (省去重複的 mkdir/stat 系統呼叫)
+_ENSURED_DIRS = set()
+
+
+def _ensure_parent(path):
+    """
+    確保檔案的上層目錄存在 (每個目錄只建立一次)
+
+    Args:
+        path (str | Path): 檔案路徑
+    """
+    parent = Path(path).parent
+    key = str(parent)
+    if key not in _ENSURED_DIRS:
+        parent.mkdir(parents=True, exist_ok=True)
+        _ENSURED_DIRS.add(key)
+
+
+def _context_options(config, storage_state=None) -> dict:
+    """
+    建立 context 的參數 (固定的 user agent / viewport / locale)
+
+    Args:
+        config: Config 物件
+        storage_state (str | dict, optional): 登入狀態檔案路徑或內容
+
+    Returns:
+        dict: browser.new_context 的參數
+    """
+    options = {
+        'user_agent': config.user_agent,
+        'viewport': {'width': 1280, 'height': 720},
+        'locale': 'zh-TW',
+    }
+    if storage_state is not None:
+        options['storage_state'] = storage_state
+    return options
+
+
+def _blocking_route_handler(blocked_types):
+    """
+    建立攔截資源的 route handler (以 set 查詢 resource_type，不做字串比對)
+
+    Args:
+        blocked_types: 要中止載入的 resource_type，例如 ('image', 'font', 'media')
+
+    Returns:
+        callable: context.route 的 handler (sync API)
+    """
+    blocked = frozenset(blocked_types)
+
+    def handler(route):
+        if route.request.resource_type in blocked:
+            route.abort()
+        else:
+            route.continue_()
+
+    return handler
+
+
+def _async_blocking_route_handler(blocked_types):
+    """同 _blocking_route_handler (async API)"""
+    blocked = frozenset(blocked_types)
+
+    async def handler(route):
+        if route.request.resource_type in blocked:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    return handler
+
+_DELAY_TABLE_SIZE = 1024  # 2 的次方，以位元遮罩取代取餘數
+
+
+def _delay_table(delay_range) -> List[float]:
+    """
+    預先產生滾動延遲表 (輪流取用，省去每次滾動的 random.uniform 與 config 查詢)
+
+    Args:
+        delay_range: [min, max] 延遲範圍 (秒)
+
+    Returns:
+        List[float]: _DELAY_TABLE_SIZE 個隨機延遲
+    """
+    lo, hi = delay_range
+    return [random.uniform(lo, hi) for _ in range(_DELAY_TABLE_SIZE)]
+
+
+# 滾動到底部並在瀏覽器內等待，返回 [滾動前高度, 等待後高度]
+_SCROLL_JS = """async (delayMs) => {
+    const oldHeight = document.body.scrollHeight;
+    window.scrollTo(0, oldHeight);
+    await new Promise(r => setTimeout(r, delayMs));
+    return [oldHeight, document.body.scrollHeight];
+}"""
+
+
+# 在瀏覽器內反覆滾動，直到連續 2 次高度不變或達到 max 次，返回 {height, scrolls}
+_SCROLL_UNTIL_STABLE_JS = """async ({max, idle}) => {
+    let prev = -1, same = 0;
+    for (let i = 0; i < max; i++) {
+        window.scrollTo(0, document.body.scrollHeight);
+        await new Promise(r => setTimeout(r, idle));
+        const h = document.body.scrollHeight;
+        if (h === prev) {
+            if (++same >= 2) return {height: h, scrolls: i + 1};
+        } else {
+            same = 0;
+            prev = h;
+        }
+    }
+    return {height: prev, scrolls: max};
+}"""
+
+# 批次讀取所有符合元素的屬性 (eval_on_selector_all 用)
+_FIELDS_JS = "(els, fields) => els.map(e => Object.fromEntries(fields.map(f => [f, e[f] ?? null])))"
+_INNER_TEXTS_JS = "els => els.map(e => e.innerText)"
+
+# 反檢測 JavaScript (移除 webdriver 標記等)，在每個頁面載入前執行
+_STEALTH_JS = """
+// 覆蓋 navigator.webdriver
+Object.defineProperty(navigator, 'webdriver', {
+    get: () => undefined
+});
+
+// 覆蓋 chrome 物件
+window.chrome = {
+    runtime: {}
+};
+
+// 覆蓋 permissions
+const originalQuery = window.navigator.permissions.query;
+window.navigator.permissions.query = (parameters) => (
+    parameters.name === 'notifications' ?
+        Promise.resolve({ state: Notification.permission }) :
+        originalQuery(parameters)
+);
+
+// 覆蓋 plugins 長度
+Object.defineProperty(navigator, 'plugins', {
+    get: () => [1, 2, 3, 4, 5]
+});
+
+// 覆蓋 languages
+Object.defineProperty(navigator, 'languages', {
+    get: () => ['zh-TW', 'zh', 'en-US', 'en']
+});
+"""
+
+# 登入狀態檢查用的選擇器
+# 使用者選單 (支援多語言)
+_USER_MENU_SELECTORS = (
+    '[aria-label*="Account"]',      # 英文
+    '[aria-label*="帳號"]',          # 繁體中文
+    '[aria-label*="账号"]',          # 簡體中文
+    '[aria-label*="個人檔案"]',      # 繁體中文
+    '[aria-label*="个人主页"]',      # 簡體中文
+    '[aria-label*="你的個人檔案"]',  # 繁體中文
+    '[aria-label*="你的个人主页"]',  # 簡體中文
+)
+
+# 導航欄 (登入後才有完整導航欄)
+_NAV_SELECTORS = (
+    'div[role="navigation"]',
+    'nav',
+    '[aria-label*="主導覽"]',
+    '[aria-label*="Primary Navigation"]',
+)
+
+# 合併成單一 CSS 選擇器 (瀏覽器只解析一次、走訪 DOM 一次)
+_USER_MENU_SELECTOR = ', '.join(_USER_MENU_SELECTORS)
+_NAV_SELECTOR = ', '.join(_NAV_SELECTORS)
+
+# 一次檢查所有登入狀態線索；找到使用者選單就直接返回，不再檢查其他項目
+# user/nav 為符合元素的描述 (沒有則為 null)
+_LOGIN_STATE_JS = """({user, nav}) => {
+    const describe = el => el.getAttribute('aria-label') || el.getAttribute('role') || el.tagName.toLowerCase();
+    const userEl = document.querySelector(user);
+    if (userEl) return {user: describe(userEl), loginButton: false, nav: null};
+    const loginButton = document.querySelector('a[href*="login"]') !== null;
+    const navEl = Array.from(document.querySelectorAll(nav)).find(el => el.innerText.length > 10);
+    return {user: null, loginButton: loginButton, nav: navEl ? describe(navEl) : null};
+}"""
+
+
+class BrowserPool:
+    """
+    程序層級的 Chromium 瀏覽器池
+
+    每次啟動 Chromium 需要數百毫秒到數秒；瀏覽器池保留已啟動的瀏覽器，
+    BrowserController.close() 只關閉 context 並歸還瀏覽器，
+    下一次 launch() 直接取用，真正的關閉由 atexit 呼叫 shutdown() 完成。
+
+    Playwright sync API 綁定建立它的執行緒，瀏覽器池只供同一執行緒使用。
+
+    使用方式:
+        pool = BrowserPool.instance(pool_size=2)
+        browser = pool.acquire(headless=True)
+        ...
+        pool.release(browser)
+    """
+
+    _instance: Optional['BrowserPool'] = None
+
+    def __init__(self, pool_size: int = 1):
+        """
+        初始化瀏覽器池
+
+        Args:
+            pool_size (int): 首次使用時預先啟動的瀏覽器數量
+        """
+        self.pool_size = max(1, pool_size)
+        self.playwright = None
+        self._idle = {}      # (headless, args) -> [Browser]
+        self._keys = {}      # Browser -> (headless, args)
+        self._browsers = []  # 所有啟動過的瀏覽器 (供 shutdown 關閉)
+
+    @classmethod
+    def instance(cls, pool_size: int = 1) -> 'BrowserPool':
+        """
+        取得程序內共用的瀏覽器池 (首次呼叫時建立並註冊 atexit 關閉)
+
+        Args:
+            pool_size (int): 預先啟動的瀏覽器數量 (只在首次建立時生效)
+
+        Returns:
+            BrowserPool: 共用的瀏覽器池
+        """
+        if cls._instance is None:
+            cls._instance = cls(pool_size)
+            atexit.register(cls.shutdown)
+        return cls._instance
+
+    def _launch(self, key) -> Browser:
+        if self.playwright is None:
+            self.playwright = sync_playwright().start()
+
+        headless, args = key
+        browser = self.playwright.chromium.launch(
+            headless=headless,
+            args=list(args)
+        )
+        self._browsers.append(browser)
+        self._keys[browser] = key
+        return browser
+
+    def _discard(self, browser: Browser):
+        """移除已崩潰或被關閉的瀏覽器"""
+        if browser in self._browsers:
+            self._browsers.remove(browser)
+        self._keys.pop(browser, None)
+
+    def acquire(self, headless: bool = False, args: List[str] = _LAUNCH_ARGS) -> Browser:
+        """
+        取得一個瀏覽器 (池中沒有可用的就新啟動)
+
+        Args:
+            headless (bool): 是否使用無頭模式
+            args (List[str]): Chromium 啟動參數 (不同參數的瀏覽器分開管理)
+
+        Returns:
+            Browser: 已啟動的瀏覽器
+        """
+        key = (headless, tuple(args))
+        if key not in self._idle:
+            # 首次使用此設定: 預先啟動 pool_size 個
+            self._idle[key] = [self._launch(key) for _ in range(self.pool_size)]
+
+        idle = self._idle[key]
+        while idle:
+            browser = idle.pop()
+            if browser.is_connected():
+                return browser
+            self._discard(browser)
+
+        return self._launch(key)
+
+    def release(self, browser: Browser):
+        """
+        歸還瀏覽器 (關閉其所有 context，瀏覽器保持運行)
+
+        Args:
+            browser (Browser): acquire() 取得的瀏覽器
+        """
+        if not browser.is_connected() or browser not in self._keys:
+            self._discard(browser)
+            return
+
+        for context in browser.contexts:
+            context.close()
+
+        self._idle[self._keys[browser]].append(browser)
+
+    @classmethod
+    def shutdown(cls):
+        """關閉池中所有瀏覽器並停止 Playwright"""
+        pool = cls._instance
+        if pool is None:
+            return
+        cls._instance = None
+
+        for browser in pool._browsers:
+            try:
+                browser.close()
+            except Exception:
+                pass  # 程序結束時瀏覽器可能已不存在
+        pool._browsers.clear()
+        pool._idle.clear()
+        pool._keys.clear()
+
+        if pool.playwright:
+            try:
+                pool.playwright.stop()
+            except Exception:
+                pass
+            pool.playwright = None
 
 
 class BrowserController:
@@ -40,14 +407,22 @@ class BrowserController:
         """
         self.config = config
         self.logger = logger
-        self.playwright = None
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
 
+        # 每 N 次導航重建一次 context (0 表示不重建)
+        # Playwright 的 Request/Response 物件要到 context 關閉才會釋放
+        self._recycle_every = config.recycle_every
+        self._goto_count = 0
+
+        # 預先產生的滾動延遲
+        self._delay_tbl = _delay_table(config.scroll_delay)
+        self._delay_i = 0
+
     def launch(self, headless: bool = False):
         """
-        啟動瀏覽器
+        啟動瀏覽器 (從 BrowserPool 取得)
 
         Args:
             headless (bool): 是否使用無頭模式
@@ -55,19 +430,9 @@ class BrowserController:
         self.logger.info(f"啟動瀏覽器 (headless={headless})...")
 
         try:
-            self.playwright = sync_playwright().start()
-
-            # 啟動 Chromium - 使用更多反檢測參數
-            self.browser = self.playwright.chromium.launch(
-                headless=headless,
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-dev-shm-usage',
-                    '--no-sandbox',
-                    '--disable-web-security',
-                    '--disable-features=IsolateOrigins,site-per-process',
-                    '--disable-site-isolation-trials',
-                ]
+            # 從瀏覽器池取得 (重複執行時不必重新啟動 Chromium)
+            self.browser = BrowserPool.instance(self.config.browser_pool_size).acquire(
+                headless, _launch_args(self.config)
             )
 
             self.logger.info("✅ 瀏覽器啟動成功")
@@ -76,35 +441,38 @@ class BrowserController:
             self.logger.error(f"啟動瀏覽器失敗: {e}", exc_info=True)
             raise
 
-    def create_context(self, cookies_path: Optional[str] = None):
+    def create_context(self, cookies_path: Optional[str] = None,
+                       storage_state: Optional[dict] = None):
         """
         建立瀏覽器 context
 
         Args:
             cookies_path (str, optional): Cookies 檔案路徑
+            storage_state (dict, optional): 記憶體中的登入狀態 (優先於 cookies_path)
         """
         try:
             # 檢查是否有 cookies
-            if cookies_path and Path(cookies_path).exists():
+            if storage_state is not None:
+                self.context = self._new_context(storage_state)
+
+            elif cookies_path and Path(cookies_path).exists():
                 self.logger.info(f"載入 Cookies: {cookies_path}")
 
-                self.context = self.browser.new_context(
-                    storage_state=cookies_path,
-                    user_agent=self.config.user_agent,
-                    viewport={'width': 1280, 'height': 720},
-                    locale='zh-TW'
-                )
+                self.context = self._new_context(cookies_path)
 
                 self.logger.info("✅ 使用現有登入狀態")
 
             else:
                 self.logger.warning("未找到 Cookies，需要手動登入")
 
-                self.context = self.browser.new_context(
-                    user_agent=self.config.user_agent,
-                    viewport={'width': 1280, 'height': 720},
-                    locale='zh-TW'
-                )
+                self.context = self._new_context()
+
+            # 注入反檢測 JavaScript (在建立頁面前註冊到 context)
+            self._inject_stealth_scripts()
+
+            # 攔截不需要的資源 (只在建立 context 時註冊一次，隨 context 回收釋放)
+            if self.config.block_resources:
+                self.context.route('**/*', _blocking_route_handler(self.config.block_resources))
 
             # 建立頁面
             self.page = self.context.new_page()
@@ -112,50 +480,47 @@ class BrowserController:
             # 設定預設 timeout
             self.page.set_default_timeout(30000)  # 30 秒
 
-            # 注入反檢測 JavaScript
-            self._inject_stealth_scripts()
-
             self.logger.info("✅ Context 建立成功")
 
         except Exception as e:
             self.logger.error(f"建立 Context 失敗: {e}", exc_info=True)
             raise
 
+    def _new_context(self, storage_state=None) -> BrowserContext:
+        """
+        以固定的 user agent / viewport / locale 建立 context
+
+        Args:
+            storage_state (str | dict, optional): 登入狀態檔案路徑或內容
+
+        Returns:
+            BrowserContext: 新的 context
+        """
+        return self.browser.new_context(**_context_options(self.config, storage_state))
+
+    def recycle_context(self):
+        """
+        重建 context (保留登入狀態)，釋放舊 context 累積的記憶體
+
+        登入狀態直接在記憶體中轉移，不經過檔案。
+        """
+        self.logger.info("♻️  重建瀏覽器 Context (釋放記憶體)...")
+
+        storage_state = self.context.storage_state()
+
+        self.page.close()
+        self.context.close()
+
+        self.create_context(storage_state=storage_state)
+        self._goto_count = 0
+
     def _inject_stealth_scripts(self):
         """
         注入反檢測 JavaScript，避免被 Facebook 識別為機器人
         """
         try:
-            # 移除 webdriver 標記
-            self.page.add_init_script("""
-                // 覆蓋 navigator.webdriver
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                });
-
-                // 覆蓋 chrome 物件
-                window.chrome = {
-                    runtime: {}
-                };
-
-                // 覆蓋 permissions
-                const originalQuery = window.navigator.permissions.query;
-                window.navigator.permissions.query = (parameters) => (
-                    parameters.name === 'notifications' ?
-                        Promise.resolve({ state: Notification.permission }) :
-                        originalQuery(parameters)
-                );
-
-                // 覆蓋 plugins 長度
-                Object.defineProperty(navigator, 'plugins', {
-                    get: () => [1, 2, 3, 4, 5]
-                });
-
-                // 覆蓋 languages
-                Object.defineProperty(navigator, 'languages', {
-                    get: () => ['zh-TW', 'zh', 'en-US', 'en']
-                });
-            """)
+            # 注入到 context：之後在此 context 開啟的每個頁面都會自動套用
+            self.context.add_init_script(_STEALTH_JS)
             self.logger.debug("✅ 反檢測腳本已注入")
 
         except Exception as e:
@@ -171,7 +536,7 @@ class BrowserController:
         """
         try:
             # 確保目錄存在
-            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            _ensure_parent(path)
 
             self.context.storage_state(path=path)
             self.logger.info(f"✅ Cookies 已儲存: {path}")
@@ -180,29 +545,55 @@ class BrowserController:
             self.logger.error(f"儲存 Cookies 失敗: {e}", exc_info=True)
             raise
 
-    def goto(self, url: str, wait_until: str = 'domcontentloaded'):
+    def goto(self, url: str, wait_until: str = 'commit'):
         """
         導航到指定 URL
 
+        預設只等到伺服器開始回應 ('commit')，再等 config.ready_selector 出現
+        (最多 3 秒)；未設定 ready_selector 時改等 DOMContentLoaded (最多 5 秒)。
+        目標內容一出現就返回，不再固定等待。
+
         Args:
             url (str): 目標 URL
-            wait_until (str): 等待條件 ('load', 'domcontentloaded', 'networkidle')
-                             預設使用 'domcontentloaded' 以避免 Facebook 等動態網站的超時問題
+            wait_until (str): 等待條件 ('commit', 'load', 'domcontentloaded', 'networkidle')
         """
         try:
+            # 每 N 次導航重建一次 context
+            if self._recycle_every and self._goto_count >= self._recycle_every:
+                self.recycle_context()
+            self._goto_count += 1
+
             self.logger.info(f"導航到: {url}")
-            # 對於 Facebook 這類持續載入內容的網站，使用 domcontentloaded 更穩定
             self.page.goto(url, wait_until=wait_until, timeout=90000)
+            self._wait_until_ready()
             self.logger.info("✅ 頁面載入完成")
 
-            # 額外等待一下，確保 JavaScript 渲染完成
-            import time
-            time.sleep(2)
-
         except Exception as e:
             self.logger.error(f"導航失敗: {e}", exc_info=True)
             raise
 
+    def _wait_until_ready(self):
+        """等待目標內容出現 (逾時不視為錯誤，交由後續的提取處理)"""
+        ready_selector = self.config.ready_selector
+        try:
+            if ready_selector:
+                self.page.wait_for_selector(ready_selector, timeout=3000)
+            else:
+                self.page.wait_for_load_state('domcontentloaded', timeout=5000)
+        except PlaywrightTimeoutError:
+            self.logger.debug(f"等待頁面內容逾時 ({ready_selector or 'domcontentloaded'})")
+
+    def next_scroll_delay(self) -> float:
+        """
+        取得下一個滾動延遲 (依序取用預先產生的隨機延遲)
+
+        Returns:
+            float: 延遲秒數 (config.scroll_delay 範圍內)
+        """
+        delay = self._delay_tbl[self._delay_i & (_DELAY_TABLE_SIZE - 1)]
+        self._delay_i += 1
+        return delay
+
     def scroll_to_bottom(self, delay: Optional[float] = None) -> bool:
         """
         滾動到頁面底部
@@ -214,22 +605,12 @@ class BrowserController:
             bool: 是否有新內容載入 (頁面高度是否增加)
         """
         try:
-            # 如果沒有指定 delay，使用配置的隨機範圍
+            # 如果沒有指定 delay，使用配置範圍內的隨機延遲
             if delay is None:
-                delay_range = self.config.scroll_delay
-                delay = random.uniform(delay_range[0], delay_range[1])
-
-            # 取得當前頁面高度
-            old_height = self.page.evaluate("document.body.scrollHeight")
+                delay = self.next_scroll_delay()
 
-            # 滾動到底部
-            self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-
-            # 等待新內容載入
-            time.sleep(delay)
-
-            # 取得新的頁面高度
-            new_height = self.page.evaluate("document.body.scrollHeight")
+            # 記錄高度 → 滾動到底部 → 等待新內容載入 → 取得新高度 (一次往返)
+            old_height, new_height = self.page.evaluate(_SCROLL_JS, delay * 1000)
 
             has_new_content = new_height > old_height
 
@@ -244,6 +625,31 @@ class BrowserController:
             self.logger.error(f"滾動失敗: {e}", exc_info=True)
             return False
 
+    def scroll_until_stable(self, max_scrolls: int = 50, idle_ms: int = 1500) -> dict:
+        """
+        持續滾動直到頁面高度不再增加 (整個過程在瀏覽器內執行，只需一次往返)
+
+        適用於先載入完整頁面再一次提取的情境；
+        Facebook 動態牆會回收捲出畫面的貼文，邊滾動邊提取時仍應使用 scroll_to_bottom()。
+
+        Args:
+            max_scrolls (int): 最多滾動次數
+            idle_ms (int): 每次滾動後等待新內容的時間 (毫秒)
+
+        Returns:
+            dict: {'height': 最終頁面高度, 'scrolls': 實際滾動次數}
+        """
+        try:
+            result = self.page.evaluate(
+                _SCROLL_UNTIL_STABLE_JS, {'max': max_scrolls, 'idle': idle_ms}
+            )
+            self.logger.debug(f"滾動 {result['scrolls']} 次，頁面高度: {result['height']}")
+            return result
+
+        except Exception as e:
+            self.logger.error(f"滾動失敗: {e}", exc_info=True)
+            return {'height': 0, 'scrolls': 0}
+
     def wait_for_selector(self, selector: str, timeout: int = 30000) -> bool:
         """
         等待元素出現
@@ -295,6 +701,60 @@ class BrowserController:
             self.logger.error(f"查找元素失敗: {selector}, {e}")
             return []
 
+    def extract_all(self, selector: str, fields: List[str]) -> List[dict]:
+        """
+        一次讀取所有符合元素的指定屬性 (單次往返，不建立 ElementHandle)
+
+        需要大量讀取時應優先使用此方法，而非 query_selector_all 後逐一讀取。
+
+        Args:
+            selector (str): CSS 選擇器
+            fields (List[str]): DOM 屬性名稱，例如 ['innerText', 'href']
+
+        Returns:
+            List[dict]: 每個元素一個 {屬性: 值}，不存在的屬性為 None
+        """
+        try:
+            return self.page.eval_on_selector_all(selector, _FIELDS_JS, fields)
+        except Exception as e:
+            self.logger.error(f"讀取元素失敗: {selector}, {e}")
+            return []
+
+    def inner_texts(self, selector: str) -> List[str]:
+        """
+        一次讀取所有符合元素的 innerText
+
+        Args:
+            selector (str): CSS 選擇器
+
+        Returns:
+            List[str]
+        """
+        try:
+            return self.page.eval_on_selector_all(selector, _INNER_TEXTS_JS)
+        except Exception as e:
+            self.logger.error(f"讀取元素失敗: {selector}, {e}")
+            return []
+
+    def wait_for_login(self, timeout: int = 5000) -> bool:
+        """
+        等待使用者選單出現 (登入完成)
+
+        以 Playwright 等待 (不是 time.sleep)，等待期間仍會處理事件與 route handler，
+        手動登入時頁面請求不會被卡住。
+
+        Args:
+            timeout (int): 最多等待時間 (毫秒)
+
+        Returns:
+            bool: 使用者選單是否出現 (出現後仍應以 is_logged_in 確認)
+        """
+        try:
+            self.page.wait_for_selector(_USER_MENU_SELECTOR, timeout=timeout)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
     def is_logged_in(self) -> bool:
         """
         檢查是否已登入 Facebook
@@ -303,50 +763,32 @@ class BrowserController:
             bool: 是否已登入
         """
         try:
-            # 方法 1: 檢查是否存在使用者選單 (支援多語言)
-            selectors = [
-                '[aria-label*="Account"]',      # 英文
-                '[aria-label*="帳號"]',          # 繁體中文
-                '[aria-label*="账号"]',          # 簡體中文
-                '[aria-label*="個人檔案"]',      # 繁體中文
-                '[aria-label*="个人主页"]',      # 簡體中文
-                '[aria-label*="你的個人檔案"]',  # 繁體中文
-                '[aria-label*="你的个人主页"]',  # 簡體中文
-            ]
-
-            for selector in selectors:
-                element = self.page.query_selector(selector)
-                if element:
-                    self.logger.debug(f"✅ 找到登入元素: {selector}")
-                    return True
-
-            # 方法 2: 檢查是否有登入按鈕 (反向檢測 - 有登入按鈕表示未登入)
-            login_button = self.page.query_selector('a[href*="login"]')
-            if login_button:
-                self.logger.debug("❌ 找到登入按鈕，表示未登入")
-                return False
-
-            # 方法 3: 檢查 URL 是否包含 login (如果跳轉到登入頁面)
+            # 方法 1: 檢查 URL 是否包含 login (跳轉到登入頁面)，不需與瀏覽器往返
             if 'login' in self.page.url.lower():
                 self.logger.debug("❌ URL 包含 'login'，表示在登入頁面")
                 return False
 
+            # 其餘線索在瀏覽器內一次檢查
+            state = self.page.evaluate(_LOGIN_STATE_JS, {
+                'user': _USER_MENU_SELECTOR,
+                'nav': _NAV_SELECTOR,
+            })
+
+            # 方法 2: 檢查是否存在使用者選單 (支援多語言)
+            if state['user']:
+                self.logger.debug(f"✅ 找到登入元素: {state['user']}")
+                return True
+
+            # 方法 3: 檢查是否有登入按鈕 (反向檢測 - 有登入按鈕表示未登入)
+            if state['loginButton']:
+                self.logger.debug("❌ 找到登入按鈕，表示未登入")
+                return False
+
             # 如果都沒有明確證據，再嘗試其他方法
-            # 檢查導航欄是否存在（登入後才有完整導航欄）
-            nav_selectors = [
-                'div[role="navigation"]',
-                'nav',
-                '[aria-label*="主導覽"]',
-                '[aria-label*="Primary Navigation"]',
-            ]
-
-            for selector in nav_selectors:
-                nav = self.page.query_selector(selector)
-                if nav:
-                    self.logger.debug(f"✅ 找到導航欄: {selector}")
-                    # 還要確認導航欄內有足夠的內容（不是空的）
-                    if len(nav.inner_text()) > 10:
-                        return True
+            # 檢查導航欄是否存在且有足夠的內容（登入後才有完整導航欄）
+            if state['nav']:
+                self.logger.debug(f"✅ 找到導航欄: {state['nav']}")
+                return True
 
             self.logger.warning("⚠️ 無法確定登入狀態，假設未登入")
             return False
@@ -363,7 +805,7 @@ class BrowserController:
             path (str): 儲存路徑
         """
         try:
-            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            _ensure_parent(path)
             self.page.screenshot(path=path)
             self.logger.info(f"截圖已儲存: {path}")
 
@@ -371,18 +813,256 @@ class BrowserController:
             self.logger.error(f"截圖失敗: {e}")
 
     def close(self):
-        """關閉瀏覽器"""
+        """
+        關閉瀏覽器
+
+        瀏覽器只歸還到 BrowserPool (關閉 context)，程序結束時才真正關閉；
+        需要立即關閉時呼叫 BrowserPool.shutdown()。
+        """
+        try:
+            if self.browser:
+                BrowserPool.instance().release(self.browser)
+                self.browser = None
+                self.context = None
+                self.page = None
+                self.logger.debug("Context 已關閉，Browser 已歸還瀏覽器池")
+
+            self.logger.info("✅ 瀏覽器已關閉")
+
+        except Exception as e:
+            self.logger.error(f"關閉瀏覽器時出錯: {e}")
+
+
+class AsyncBrowserController:
+    """
+    非同步瀏覽器控制器 (playwright.async_api)
+
+    共用一個瀏覽器，以多個 context (工作槽) 同時抓取多個 URL。
+    每個 context 載入 recycle_every 個頁面後重建，避免記憶體持續增長。
+
+    使用方式:
+        browser = AsyncBrowserController(config, logger)
+        await browser.launch(headless=True)
+        results = await browser.scrape_many(urls, concurrency=4)
+        await browser.close()
+
+        # 或
+        async with AsyncBrowserController(config, logger) as browser:
+            results = await browser.scrape_many(urls)
+    """
+
+    def __init__(self, config, logger, cookies_path: Optional[str] = None):
+        """
+        初始化非同步瀏覽器控制器
+
+        Args:
+            config: Config 物件
+            logger: ScraperLogger 物件
+            cookies_path (str, optional): Cookies 檔案路徑 (預設使用 config.cookies_path)
+        """
+        self.config = config
+        self.logger = logger
+        self.cookies_path = cookies_path or config.cookies_path
+        self.playwright = None
+        self.browser = None
+
+        self._recycle_every = config.recycle_every
+
+        # 預先產生的滾動延遲 (同 BrowserController)
+        self._delay_tbl = _delay_table(config.scroll_delay)
+        self._delay_i = 0
+
+    async def __aenter__(self):
+        await self.launch(headless=self.config.headless)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def launch(self, headless: bool = False):
+        """
+        啟動瀏覽器
+
+        Args:
+            headless (bool): 是否使用無頭模式
+        """
+        self.logger.info(f"啟動瀏覽器 (async, headless={headless})...")
+
         try:
-            if self.context:
-                self.context.close()
-                self.logger.debug("Context 已關閉")
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(
+                headless=headless,
+                args=_launch_args(self.config)
+            )
+            self.logger.info("✅ 瀏覽器啟動成功")
+
+        except Exception as e:
+            self.logger.error(f"啟動瀏覽器失敗: {e}", exc_info=True)
+            raise
+
+    async def create_context(self, storage_state=None):
+        """
+        建立瀏覽器 context (已注入反檢測腳本)
+
+        Args:
+            storage_state (str | dict, optional): 登入狀態檔案路徑或內容
+                                                  (預設使用 cookies_path，如存在)
+
+        Returns:
+            BrowserContext: 新的 context
+        """
+        if storage_state is None and self.cookies_path and Path(self.cookies_path).exists():
+            storage_state = self.cookies_path
+
+        context = await self.browser.new_context(**_context_options(self.config, storage_state))
+        await context.add_init_script(_STEALTH_JS)
+        if self.config.block_resources:
+            await context.route('**/*', _async_blocking_route_handler(self.config.block_resources))
+        context.set_default_timeout(30000)  # 30 秒
+        return context
+
+    async def _recycle(self, context):
+        """
+        重建 context (保留登入狀態)
+
+        Args:
+            context: 舊的 BrowserContext
+
+        Returns:
+            BrowserContext: 新的 context
+        """
+        self.logger.debug("♻️  重建瀏覽器 Context (釋放記憶體)...")
+        storage_state = await context.storage_state()
+        await context.close()
+        return await self.create_context(storage_state)
+
+    async def goto(self, page, url: str, wait_until: str = 'commit'):
+        """
+        導航到指定 URL (等待方式同 BrowserController.goto)
+
+        Args:
+            page: Playwright (async) Page 物件
+            url (str): 目標 URL
+            wait_until (str): 等待條件 ('commit', 'load', 'domcontentloaded', 'networkidle')
+        """
+        self.logger.info(f"導航到: {url}")
+        await page.goto(url, wait_until=wait_until, timeout=90000)
 
+        ready_selector = self.config.ready_selector
+        try:
+            if ready_selector:
+                await page.wait_for_selector(ready_selector, timeout=3000)
+            else:
+                await page.wait_for_load_state('domcontentloaded', timeout=5000)
+        except AsyncTimeoutError:
+            self.logger.debug(f"等待頁面內容逾時 ({ready_selector or 'domcontentloaded'})")
+
+    async def scroll_to_bottom(self, page, delay: Optional[float] = None) -> bool:
+        """
+        滾動到頁面底部
+
+        Args:
+            page: Playwright (async) Page 物件
+            delay (float, optional): 滾動後等待時間 (秒)
+
+        Returns:
+            bool: 是否有新內容載入 (頁面高度是否增加)
+        """
+        if delay is None:
+            delay = self._delay_tbl[self._delay_i & (_DELAY_TABLE_SIZE - 1)]
+            self._delay_i += 1
+
+        old_height, new_height = await page.evaluate(_SCROLL_JS, delay * 1000)
+        return new_height > old_height
+
+    async def scroll_until_stable(self, page, max_scrolls: int = 50,
+                                  idle_ms: int = 1500) -> dict:
+        """
+        持續滾動直到頁面高度不再增加 (同 BrowserController.scroll_until_stable)
+
+        Args:
+            page: Playwright (async) Page 物件
+            max_scrolls (int): 最多滾動次數
+            idle_ms (int): 每次滾動後等待新內容的時間 (毫秒)
+
+        Returns:
+            dict: {'height': 最終頁面高度, 'scrolls': 實際滾動次數}
+        """
+        return await page.evaluate(
+            _SCROLL_UNTIL_STABLE_JS, {'max': max_scrolls, 'idle': idle_ms}
+        )
+
+    async def scrape_many(self, urls: List[str], handler=None,
+                          concurrency: int = 4) -> List:
+        """
+        同時抓取多個 URL
+
+        Args:
+            urls (List[str]): 目標 URL 列表
+            handler (callable, optional): async (page, url) -> 結果；
+                                          預設以 AsyncPostExtractor 提取頁面上的貼文
+            concurrency (int): 同時使用的 context 數量
+
+        Returns:
+            List: 與 urls 同順序的結果 (失敗的 URL 為 Exception 物件)
+        """
+        if handler is None:
+            from extractor import make_extractor
+            extractor = make_extractor(self.logger, use_async=True)
+
+            async def handler(page, url):
+                return await extractor.extract_posts_data(page)
+
+        # 工作槽: 每個槽一個 context，用 Queue 輪流取用
+        slots = asyncio.Queue()
+        for _ in range(min(concurrency, len(urls)) or 1):
+            slots.put_nowait([await self.create_context(), 0])
+
+        async def scrape_one(url):
+            slot = await slots.get()
+            try:
+                context, used = slot
+                if self._recycle_every and used >= self._recycle_every:
+                    slot[0] = context = await self._recycle(context)
+                    slot[1] = 0
+                slot[1] += 1
+
+                page = await context.new_page()
+                try:
+                    await self.goto(page, url)
+                    return await handler(page, url)
+                finally:
+                    await page.close()
+
+            except Exception as e:
+                self.logger.error(f"抓取失敗: {url}, {e}")
+                raise
+
+            finally:
+                slots.put_nowait(slot)
+
+        try:
+            return await asyncio.gather(
+                *(scrape_one(url) for url in urls),
+                return_exceptions=True
+            )
+
+        finally:
+            while not slots.empty():
+                context, _ = slots.get_nowait()
+                await context.close()
+
+    async def close(self):
+        """關閉瀏覽器"""
+        try:
             if self.browser:
-                self.browser.close()
+                await self.browser.close()
+                self.browser = None
                 self.logger.debug("Browser 已關閉")
 
             if self.playwright:
-                self.playwright.stop()
+                await self.playwright.stop()
+                self.playwright = None
                 self.logger.debug("Playwright 已停止")
 
             self.logger.info("✅ 瀏覽器已關閉")
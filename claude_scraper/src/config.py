@@ -9,10 +9,16 @@
 - 配置驗證
 """
 
+import functools
 import json
 import os
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any
+
+try:
+    import orjson  # 選用：較快的 JSON 解析
+except ImportError:
+    orjson = None
 
 
 class Config:
@@ -26,6 +32,41 @@ class Config:
         group_url = config.group_url
     """
 
+    # 便捷屬性: 屬性名稱 → (配置路徑, 預設值)
+    # 載入時一次解析為實例屬性，之後讀取不再經過 get()
+    _PROP_MAP = {
+        # === Facebook ===
+        'group_url': ('facebook.group_url', None),                    # Facebook 社團 URL
+        'cookies_path': ('facebook.cookies_path', 'config/auth.json'),  # Cookies 檔案路徑
+        'user_agent': ('facebook.user_agent', None),                  # 使用者代理字串
+
+        # === Scraper ===
+        'max_posts': ('scraper.max_posts_per_run', 500),              # 單次執行最大抓取數
+        'scroll_delay': ('scraper.scroll_delay', [1.5, 3.0]),         # 滾動延遲範圍 [min, max]
+        'reading_delay': ('scraper.reading_delay', [0.5, 1.5]),       # 閱讀延遲範圍 [min, max]
+        'max_retries': ('scraper.max_retries', 3),                    # 最大重試次數
+        'headless': ('scraper.headless', False),                      # 是否使用無頭模式
+        'recycle_every': ('scraper.recycle_every', 25),               # 每 N 次導航重建瀏覽器 context (0 = 不重建)
+        'browser_pool_size': ('scraper.browser_pool_size', 1),        # 瀏覽器池預先啟動的 Chromium 數量
+        'need_rendering': ('scraper.need_rendering', False),          # 保留 GPU/WebGL 等渲染功能 (False = 精簡啟動參數)
+        'ready_selector': ('scraper.ready_selector', '[role="article"]'),  # 導航後等待出現的元素 (null = 等 DOMContentLoaded)
+        'block_resources': ('scraper.block_resources', ['image', 'font', 'media']),  # 不載入的資源類型 (可加 'stylesheet')
+        'single_writer': ('scraper.single_writer', False),            # 只有本程序寫入資料目錄 (不使用檔案鎖)
+        'save_flush_every': ('scraper.save_flush_every', 50),         # single_writer 時累積幾則貼文寫入一次
+        'save_compress': ('scraper.save_compress', False),            # 輸出 gzip 壓縮的 .jsonl.gz
+        'bounded_dedup': ('scraper.bounded_dedup', False),            # 固定記憶體去重 (長時間執行；舊貼文可能再處理一次，少數新貼文可能因誤判被永久跳過)
+
+        # === Paths ===
+        'save_script_path': ('paths.save_script', None),              # Gemini 存檔腳本路徑
+        'data_dir': ('paths.data_dir', None),                         # 資料目錄
+        'state_file': ('paths.state_file', 'state/scraper_state.json'),  # 狀態檔案路徑
+        'log_dir': ('paths.log_dir', 'logs/'),                        # 日誌目錄
+
+        # === Monitoring ===
+        'enable_progress_bar': ('monitoring.enable_progress_bar', True),  # 是否啟用進度條
+        'log_level': ('monitoring.log_level', 'INFO'),                # 日誌等級
+    }
+
     def __init__(self, config_path='config/config.json'):
         """
         初始化配置管理器
@@ -38,25 +79,90 @@ class Config:
             json.JSONDecodeError: 配置檔案格式錯誤
         """
         self.config_path = Path(config_path)
+        self.reload()
+
+    def reload(self):
+        """
+        重新載入配置檔，並重新套用環境變數覆蓋
 
-        if not self.config_path.exists():
+        Raises:
+            FileNotFoundError: 配置檔案不存在
+            json.JSONDecodeError: 配置檔案格式錯誤
+            ValueError: 缺少必要欄位
+        """
+        # 直接 stat，不存在時才轉成提示訊息 (省去 exists() 的額外檢查)
+        try:
+            mtime_ns = self.config_path.stat().st_mtime_ns
+        except FileNotFoundError:
             raise FileNotFoundError(
-                f"\n配置檔案不存在: {config_path}\n"
+                f"\n配置檔案不存在: {self.config_path}\n"
                 f"請複製 config.example.json 到 config.json 並填寫您的設定:\n"
-                f"  cp {self.config_path.parent}/config.example.json {config_path}\n"
+                f"  cp {self.config_path.parent}/config.example.json {self.config_path}\n"
+            ) from None
+
+        # 以 (路徑, 修改時間) 為 key 快取解析結果，同一檔案只解析一次
+        try:
+            self.data = self._load(os.path.abspath(self.config_path), mtime_ns)
+        except json.JSONDecodeError as e:
+            raise json.JSONDecodeError(
+                f"配置檔案格式錯誤: {e}",
+                e.doc,
+                e.pos
             )
 
-        with open(self.config_path, 'r', encoding='utf-8') as f:
-            try:
-                self.data = json.load(f)
-            except json.JSONDecodeError as e:
-                raise json.JSONDecodeError(
-                    f"配置檔案格式錯誤: {e}",
-                    e.doc,
-                    e.pos
-                )
+        # 環境變數快照 (執行期間變更環境變數後需呼叫 reload())
+        self._env_snapshot = dict(os.environ)
 
+        self._flatten()
         self._validate()
+        self._resolve_properties()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def _load(path_str: str, mtime_ns: int) -> dict:
+        """
+        讀取並解析配置檔 (結果由所有 Config 實例共用，請勿直接修改)
+
+        Args:
+            path_str (str): 配置檔案絕對路徑
+            mtime_ns (int): 檔案修改時間，檔案變更後自動失效
+
+        Returns:
+            dict: 配置資料
+        """
+        with open(path_str, 'rb') as f:
+            raw = f.read()
+
+        if orjson is not None:
+            return orjson.loads(raw)
+        return json.loads(raw.decode('utf-8'))
+
+    def _flatten(self):
+        """
+        預先展開巢狀配置為扁平索引
+
+        產生:
+            self._flat: {'facebook.group_url': ..., 'scraper.max_posts_per_run': ..., ...}
+            self._env_map: {'facebook.group_url': 'FACEBOOK_GROUP_URL', ...}
+        """
+        self._flat = {}
+        self._env_map = {}
+
+        def walk(node: dict, prefix: tuple):
+            for key, value in node.items():
+                keys = prefix + (key,)
+                key_path = '.'.join(keys)
+                self._flat[key_path] = value
+                self._env_map[key_path] = '_'.join(keys).upper()
+                if isinstance(value, dict):
+                    walk(value, keys)
+
+        walk(self.data, ())
+
+    def _resolve_properties(self):
+        """將 _PROP_MAP 中的便捷屬性解析為實例屬性"""
+        for name, (key_path, default) in self._PROP_MAP.items():
+            setattr(self, name, self.get(key_path, default))
 
     def _validate(self):
         """驗證配置的必要欄位"""
@@ -89,101 +195,37 @@ class Config:
         Returns:
             Any: 配置值，若不存在則返回 default
         """
+        # 支援環境變數覆蓋 (使用載入時的快照)
+        # 例如: FACEBOOK_GROUP_URL 會覆蓋 facebook.group_url
+        env_key = self._env_map.get(key_path)
+        if env_key is not None:
+            env_value = self._env_snapshot.get(env_key)
+            if env_value is not None:
+                return env_value
+
+        return self._flat.get(key_path, default)
+
+    def set(self, key_path: str, value: Any):
+        """
+        覆蓋配置值 (只影響此實例，不會修改共用的快取資料)
+
+        Args:
+            key_path (str): 配置路徑，用點號分隔 (e.g., 'scraper.headless')
+            value (Any): 新的值
+        """
         keys = key_path.split('.')
-        value = self.data
-
-        for key in keys:
-            if isinstance(value, dict) and key in value:
-                value = value[key]
-            else:
-                return default
-
-        # 支援環境變數覆蓋
-        # 例如: FB_GROUP_URL 會覆蓋 facebook.group_url
-        env_key = '_'.join(keys).upper()
-        env_value = os.getenv(env_key)
-        if env_value is not None:
-            return env_value
-
-        return value
-
-    # === 便捷屬性 (Facebook) ===
-
-    @property
-    def group_url(self) -> str:
-        """Facebook 社團 URL"""
-        return self.get('facebook.group_url')
-
-    @property
-    def cookies_path(self) -> str:
-        """Cookies 檔案路徑"""
-        return self.get('facebook.cookies_path', 'config/auth.json')
-
-    @property
-    def user_agent(self) -> Optional[str]:
-        """使用者代理字串"""
-        return self.get('facebook.user_agent')
-
-    # === 便捷屬性 (Scraper) ===
-
-    @property
-    def max_posts(self) -> int:
-        """單次執行最大抓取數"""
-        return self.get('scraper.max_posts_per_run', 500)
-
-    @property
-    def scroll_delay(self) -> list:
-        """滾動延遲範圍 [min, max]"""
-        return self.get('scraper.scroll_delay', [1.5, 3.0])
-
-    @property
-    def reading_delay(self) -> list:
-        """閱讀延遲範圍 [min, max]"""
-        return self.get('scraper.reading_delay', [0.5, 1.5])
-
-    @property
-    def max_retries(self) -> int:
-        """最大重試次數"""
-        return self.get('scraper.max_retries', 3)
-
-    @property
-    def headless(self) -> bool:
-        """是否使用無頭模式"""
-        return self.get('scraper.headless', False)
-
-    # === 便捷屬性 (Paths) ===
-
-    @property
-    def save_script_path(self) -> str:
-        """Gemini 存檔腳本路徑"""
-        return self.get('paths.save_script')
-
-    @property
-    def data_dir(self) -> str:
-        """資料目錄"""
-        return self.get('paths.data_dir')
-
-    @property
-    def state_file(self) -> str:
-        """狀態檔案路徑"""
-        return self.get('paths.state_file', 'state/scraper_state.json')
-
-    @property
-    def log_dir(self) -> str:
-        """日誌目錄"""
-        return self.get('paths.log_dir', 'logs/')
-
-    # === 便捷屬性 (Monitoring) ===
-
-    @property
-    def enable_progress_bar(self) -> bool:
-        """是否啟用進度條"""
-        return self.get('monitoring.enable_progress_bar', True)
-
-    @property
-    def log_level(self) -> str:
-        """日誌等級"""
-        return self.get('monitoring.log_level', 'INFO')
+
+        # 沿路徑複製巢狀 dict (copy-on-write)
+        self.data = dict(self.data)
+        node = self.data
+        for key in keys[:-1]:
+            child = node.get(key)
+            node[key] = dict(child) if isinstance(child, dict) else {}
+            node = node[key]
+
+        node[keys[-1]] = value
+        self._flatten()
+        self._resolve_properties()
 
     def __repr__(self) -> str:
         """字串表示"""
@@ -227,6 +269,7 @@ if __name__ == '__main__':
     # 測試 4: 環境變數覆蓋
     print("\n[測試 4] 環境變數覆蓋")
     os.environ['SCRAPER_MAX_POSTS_PER_RUN'] = '999'
+    config.reload()  # 環境變數在載入時快照，變更後需重新載入
     max_posts_override = config.get('scraper.max_posts_per_run')
     print(f"✅ 環境變數覆蓋: max_posts_per_run = {max_posts_override}")
     del os.environ['SCRAPER_MAX_POSTS_PER_RUN']
@@ -8,13 +8,186 @@
 - 提取貼文內容
 - 提取貼文 URL
 - 提取時間戳
+
+DOM 查詢都在瀏覽器內完成，Python 端的後處理 (_postprocess) 只使用標準函式庫，
+可直接在 PyPy 下執行 (pypy3 src/scraper.py)。效能量測請見 tests/bench_extractor.py
 """
 
+import asyncio
+import functools
 import hashlib
+import logging
 import re
-from typing import Optional, Dict, List
+import time
+from typing import Optional, Dict, List, Tuple
 from datetime import datetime
 
+try:
+    import xxhash  # 選用：較快的內容 hash
+except ImportError:
+    xxhash = None
+
+# 貼文 ID 相關的正規表達式 (預先編譯)
+_POST_ID_RE = re.compile(r'/(?:posts|permalink)/(\d+)')   # /posts/123 或 /permalink/123
+_STORY_FBID_RE = re.compile(r'story_fbid=(\d+)')          # ?story_fbid=123
+_LONG_DIGITS_RE = re.compile(r'\d{10,}')                   # 屬性中的長數字 ID
+
+
+@functools.lru_cache(maxsize=4096)
+def _post_id_from_url(url: str) -> Optional[str]:
+    """
+    從貼文 URL 提取數字 ID (結果快取，滾動時重複出現的貼文不必重新比對)
+
+    Args:
+        url (str): 貼文 URL (e.g., /posts/123456789 或 /permalink/123456789)
+
+    Returns:
+        Optional[str]: 貼文 ID，URL 中沒有 ID 時為 None
+    """
+    match = _POST_ID_RE.search(url) or _STORY_FBID_RE.search(url)
+    return match.group(1) if match else None
+
+# 在瀏覽器內找到第一個可見的「查看更多」按鈕並點擊 (依選擇器順序)
+_EXPAND_JS = """(el, {pattern, selectors}) => {
+    const seeMore = new RegExp(pattern);
+    for (const sel of selectors) {
+        for (const b of el.querySelectorAll(sel)) {
+            if (seeMore.test(b.innerText || '') && b.offsetParent !== null) {
+                b.click();
+                return true;
+            }
+        }
+    }
+    return false;
+}"""
+
+# 在瀏覽器內依優先順序嘗試文本選擇器 (前 3 個為精確選擇器，最後一個為 fallback)，
+# 返回第一個夠長的文本，都不符合時返回整個元素的文本
+# 以合併後的選擇器 (group) 只走訪一次子樹，再依優先順序挑選
+_TEXT_JS = """(el, selectors, group) => {
+    const precise = selectors.slice(0, 3);
+    const fallback = selectors[selectors.length - 1];
+
+    const first = precise.map(() => null);
+    const fallbackNodes = [];
+    for (const n of el.querySelectorAll(group)) {
+        precise.forEach((s, i) => { if (first[i] === null && n.matches(s)) first[i] = n; });
+        if (n.matches(fallback)) fallbackNodes.push(n);
+    }
+
+    for (const n of first) {
+        const t = n ? (n.innerText || '').trim() : '';
+        if (t.length > 10) return t;
+    }
+    // textContent 不需要版面計算，先用它排除短文本，只對候選元素讀 innerText
+    for (const n of fallbackNodes) {
+        if (n.textContent.trim().length <= 30) continue;
+        const t = (n.innerText || '').trim();
+        if (t.length > 30) return t;
+    }
+    return (el.innerText || '').trim();
+}"""
+
+# 在瀏覽器內一次讀取單一貼文元素的所有欄位 (文本、連結、ID 屬性、時間、作者)
+# Python 端只負責 _postprocess (URL 清理、ID 解析、時間格式)
+_SCAN_JS = """(a, {textSelectors, textSelectorGroup, urlSelector, idAttrs}) => {
+    const extractText = """ + _TEXT_JS + """;
+    const time = a.querySelector('abbr, time');
+    const author = a.querySelector('a[role="link"]');
+    const link = a.querySelector(urlSelector);
+
+    return {
+        text: extractText(a, textSelectors, textSelectorGroup),
+        href: link ? link.getAttribute('href') : null,
+        idAttrs: idAttrs.map(name => a.getAttribute(name)),
+        time: time ? {
+            utime: time.getAttribute('data-utime'),
+            datetime: time.getAttribute('datetime'),
+            title: time.getAttribute('title'),
+        } : null,
+        author: author ? (author.innerText || '').trim() : null,
+    };
+}"""
+
+# 在瀏覽器內一次提取頁面上所有貼文的原始資料：
+# 1. 展開所有「查看更多」
+# 2. 對每個 role="article" 執行 _SCAN_JS
+_EXTRACT_JS = """async (args) => {
+    const seeMore = new RegExp(args.seeMorePattern);
+    const scan = """ + _SCAN_JS + """;
+
+    const articles = Array.from(document.querySelectorAll('[role="article"]'));
+
+    // 每個 article 元素的掃描結果 (跨滾動保留；元素被移除後隨 WeakMap 回收)
+    // 以 aria-labelledby + textContent 長度確認元素內容未被替換
+    const key = Symbol.for('scraper.scanCache');
+    const cache = window[key] || (window[key] = new WeakMap());
+    const fingerprint = a => (a.getAttribute('aria-labelledby') || '') + ':' + a.textContent.length;
+
+    // 1. 展開「查看更多」
+    const findSeeMore = (a) => {
+        for (const sel of args.buttonSelectors) {
+            for (const b of a.querySelectorAll(sel)) {
+                if (seeMore.test(b.innerText || '') && b.offsetParent !== null) return b;
+            }
+        }
+        return null;
+    };
+    let expanded = false;
+    for (const a of articles) {
+        const b = findSeeMore(a);
+        if (b) { b.click(); expanded = true; }
+    }
+    if (expanded) await new Promise(r => setTimeout(r, 500));
+
+    // 2. 提取資料 (內容未變的 article 直接沿用上次的結果)
+    return articles.map(a => {
+        const fp = fingerprint(a);
+        const hit = cache.get(a);
+        if (hit && hit.fp === fp) return hit.data;
+        const data = scan(a, args);
+        cache.set(a, {fp: fp, data: data});
+        return data;
+    });
+}"""
+
+# 滾動到底部、在瀏覽器內等待新內容，再執行 _EXTRACT_JS (一次往返)
+# 至少等待 delayMs (模擬閱讀節奏)，之後只要貼文數或頁面高度增加就不再等待，最多等到 maxWaitMs
+# 返回 {posts, oldHeight, newHeight}
+_SCROLL_EXTRACT_JS = """async (args) => {
+    const extract = """ + _EXTRACT_JS + """;
+    const sleep = ms => new Promise(r => setTimeout(r, ms));
+    const countArticles = () => document.querySelectorAll('[role="article"]').length;
+
+    const oldHeight = document.body.scrollHeight;
+    const oldCount = countArticles();
+    const start = Date.now();
+    window.scrollTo(0, oldHeight);
+
+    await sleep(args.delayMs);
+    while (Date.now() - start < args.maxWaitMs
+           && countArticles() <= oldCount && document.body.scrollHeight <= oldHeight) {
+        await sleep(100);
+    }
+    const newHeight = document.body.scrollHeight;
+
+    return {posts: await extract(args), oldHeight: oldHeight, newHeight: newHeight};
+}"""
+
+# 在頁面中安裝 _EXTRACT_JS / _SCROLL_EXTRACT_JS (每個文件只傳送、解析一次)
+_INSTALL_JS = """() => {
+    window[Symbol.for('scraper.fns')] = {
+        extract: """ + _EXTRACT_JS + """,
+        scrollExtract: """ + _SCROLL_EXTRACT_JS + """,
+    };
+}"""
+
+# 呼叫已安裝的函式；頁面重新載入後尚未安裝時返回 null
+_CALL_JS = """({name, args}) => {
+    const fns = window[Symbol.for('scraper.fns')];
+    return fns ? fns[name](args) : null;
+}"""
+
 
 class PostExtractor:
     """
@@ -22,6 +195,12 @@ class PostExtractor:
 
     使用方式:
         extractor = PostExtractor(logger)
+
+        # 批次提取 (一次 page.evaluate，建議)
+        for data in extractor.extract_posts_data(page):
+            print(data)
+
+        # 逐元素提取
         posts = extractor.extract_posts(page)
         for post in posts:
             data = extractor.extract_post_data(post)
@@ -29,6 +208,74 @@ class PostExtractor:
                 print(data)
     """
 
+    # 多種「查看更多」的可能文字（支援多語言）
+    _SEE_MORE_TEXTS = (
+        'See more',
+        'See More',
+        '查看更多',
+        '顯示更多',
+        '显示更多',
+        'Xem thêm',  # 越南文
+        'もっと見る',  # 日文
+    )
+
+    # 所有「查看更多」文字的交替式 (一次掃描取代逐一 in 比對)
+    # 只含字面文字，pattern 同時可作為 JavaScript RegExp 使用
+    _SEE_MORE_RE = re.compile('|'.join(map(re.escape, _SEE_MORE_TEXTS)))
+
+    # 可能是「查看更多」的按鈕元素
+    _BUTTON_SELECTORS = (
+        'div[role="button"]',
+        'span[role="button"]',
+    )
+
+    # Facebook 貼文內容的多種可能選擇器（優先順序從高到低）
+    # 前 3 個為精確選擇器，最後一個為 fallback
+    _TEXT_SELECTORS = (
+        # 新版 Facebook 選擇器
+        'div[data-ad-comet-preview="message"]',
+        'div[data-ad-preview="message"]',
+        '[data-ad-rendering-role="story_message"]',
+
+        # 通用選擇器 - 貼文內容通常在 dir="auto" 的 div 中
+        'div[dir="auto"][style*="text-align"]',
+
+        # 更寬鬆的選擇器
+        'div[dir="auto"]',
+    )
+
+    # 精確選擇器 + fallback 合併為單一選擇器，一次查詢 (由 _TEXT_JS 依優先順序挑選)
+    _TEXT_SELECTOR_GROUP = ', '.join(_TEXT_SELECTORS[:3] + _TEXT_SELECTORS[-1:])
+
+    # 貼文永久連結 (包含 /posts/ 或 /permalink/ 的連結)
+    _URL_SELECTORS = (
+        'a[href*="/posts/"]',
+        'a[href*="/permalink/"]',
+        'a[href*="story_fbid"]',
+    )
+    # 合併為單一選擇器，一次查詢 (返回文件順序中第一個符合的連結)
+    _URL_SELECTOR = ', '.join(_URL_SELECTORS)
+
+    # 可能包含貼文 ID 的元素屬性 (依優先順序)
+    _ID_ATTRS = ('data-ft', 'data-testid', 'id')
+
+    # 傳給 _EXPAND_JS / _SCAN_JS / _EXTRACT_JS 的參數
+    _EXPAND_ARGS = {
+        'pattern': _SEE_MORE_RE.pattern,
+        'selectors': _BUTTON_SELECTORS,
+    }
+    _SCAN_ARGS = {
+        'textSelectors': _TEXT_SELECTORS,
+        'textSelectorGroup': _TEXT_SELECTOR_GROUP,
+        'urlSelector': _URL_SELECTOR,
+        'idAttrs': _ID_ATTRS,
+    }
+    _EXTRACT_ARGS = {
+        **_SCAN_ARGS,
+        'seeMorePattern': _SEE_MORE_RE.pattern,
+        'buttonSelectors': _BUTTON_SELECTORS,
+    }
+
     def __init__(self, logger):
         """
         初始化貼文提取器
@@ -38,6 +285,9 @@ class PostExtractor:
         """
         self.logger = logger
 
+        # 最近一次 extract_posts 的時間，作為同批元素的 extracted_at
+        self._batch_ts = None
+
     def extract_posts(self, page) -> List:
         """
         提取頁面上所有可見的貼文元素
@@ -51,344 +301,504 @@ class PostExtractor:
         try:
             # Facebook 使用 role="article" 標記貼文
             posts = page.query_selector_all('[role="article"]')
-            self.logger.debug(f"找到 {len(posts)} 個貼文元素")
+            self.logger.debug("找到 %d 個貼文元素", len(posts))
+            self._batch_ts = datetime.now().isoformat()
             return posts
 
         except Exception as e:
             self.logger.error(f"提取貼文列表失敗: {e}", exc_info=True)
             return []
 
-    def extract_post_data(self, post_element) -> Optional[Dict]:
+    def warmup(self, page):
         """
-        從貼文元素提取所有需要的資料
+        在頁面中預先安裝批次提取用的 JavaScript 函式
+
+        之後 extract_posts_data / scroll_and_extract 只傳送函式名稱與參數，
+        不必每次傳送並重新解析整段程式碼。頁面重新載入後第一次呼叫時自動重新安裝。
 
         Args:
-            post_element: Playwright ElementHandle
+            page: Playwright Page 物件
+        """
+        page.evaluate(_INSTALL_JS)
+
+    def _call(self, page, name: str, args: Dict):
+        """呼叫 warmup 安裝的函式 (尚未安裝時先安裝)"""
+        result = page.evaluate(_CALL_JS, {'name': name, 'args': args})
+        if result is None:
+            self.warmup(page)
+            result = page.evaluate(_CALL_JS, {'name': name, 'args': args})
+        return result
+
+    def extract_posts_data(self, page) -> List[Dict]:
+        """
+        一次 page.evaluate 提取頁面上所有貼文的資料
+
+        與逐元素呼叫 extract_post_data 的結果相同，但所有 DOM 查詢都在
+        瀏覽器內完成，每頁只需一次往返。
+
+        Args:
+            page: Playwright Page 物件
 
         Returns:
-            Optional[Dict]: 貼文資料，若提取失敗則為 None
-            {
-                'id': str,          # 貼文唯一 ID
-                'text': str,        # 貼文文本內容
-                'url': str,         # 貼文連結
-                'timestamp': str,   # 發布時間 (如有)
-                'author': str,      # 作者 (如有)
-            }
+            List[Dict]: 貼文資料列表 (已過濾留言與過短的貼文)
         """
         try:
-            # 0. 先檢查這是否是留言（不是主貼文）
-            # 留言的永久連結包含 ?comment 參數
-            url = self._extract_url(post_element)
-            if url and '?comment' in url:
-                self.logger.debug(f"跳過：這是留言，不是主貼文 (URL: {url[:80]})")
-                return None
+            raw_posts = self._call(page, 'extract', self._EXTRACT_ARGS)
+        except Exception as e:
+            self.logger.error(f"批次提取貼文失敗: {e}", exc_info=True)
+            return []
 
-            # 1. 展開「查看更多」按鈕（如果有的話）
-            self._expand_see_more(post_element)
+        return self._postprocess_all(raw_posts)
 
-            # 2. 提取文本內容
-            text = self._extract_text(post_element)
+    def scroll_and_extract(self, page, delay: float,
+                          max_wait: Optional[float] = None) -> Tuple[List[Dict], bool]:
+        """
+        滾動到底部、等待新內容後提取所有貼文 (一次 page.evaluate)
 
-            if not text or len(text.strip()) < 5:
-                self.logger.debug(f"跳過：貼文文本過短 (僅 {len(text)} 字元): '{text[:50]}'")
-                return None
+        至少等待 delay 秒；之後新貼文一出現 (或頁面高度增加) 就提取，
+        最多等待 max_wait 秒 (預設 delay + 2)。
 
-            # URL 已經在步驟 0 提取過了
+        Args:
+            page: Playwright Page 物件
+            delay (float): 滾動後最少等待時間 (秒)
+            max_wait (float, optional): 滾動後最多等待時間 (秒)
 
-            # 3. 提取貼文 ID
-            post_id = self._extract_post_id(post_element, url, text)
+        Returns:
+            Tuple[List[Dict], bool]: (貼文資料列表, 是否有新內容載入)
+        """
+        try:
+            result = self._call(page, 'scrollExtract', self._scroll_args(delay, max_wait))
+        except Exception as e:
+            self.logger.error(f"滾動提取貼文失敗: {e}", exc_info=True)
+            return [], False
 
-            # 4. 提取時間戳 (選用)
-            timestamp = self._extract_timestamp(post_element)
+        return self._postprocess_all(result['posts']), self._grew(result)
 
-            # 5. 提取作者 (選用)
-            author = self._extract_author(post_element)
+    def _scroll_args(self, delay: float, max_wait: Optional[float]) -> Dict:
+        """_SCROLL_EXTRACT_JS 的參數 (秒 → 毫秒)"""
+        if max_wait is None:
+            max_wait = delay + 2
+        return {**self._EXTRACT_ARGS, 'delayMs': delay * 1000, 'maxWaitMs': max_wait * 1000}
+
+    def _grew(self, result: Dict) -> bool:
+        """由 _SCROLL_EXTRACT_JS 的結果判斷頁面高度是否增加"""
+        old_height, new_height = result['oldHeight'], result['newHeight']
+        if new_height > old_height:
+            self.logger.debug("頁面高度: %d → %d (+%dpx)", old_height, new_height, new_height - old_height)
+            return True
+
+        self.logger.debug("頁面高度未改變，可能已到底")
+        return False
+
+    def _postprocess_all(self, raw_posts: List[Dict]) -> List[Dict]:
+        """
+        將 _EXTRACT_JS 回傳的原始資料列表轉成貼文資料列表
+
+        Args:
+            raw_posts (List[Dict]): 每個 article 的原始資料
+
+        Returns:
+            List[Dict]: 貼文資料列表 (已過濾留言與過短的貼文)
+        """
+        self.logger.debug("找到 %d 個貼文元素", len(raw_posts))
+
+        # 同一批貼文共用提取時間，不必每則貼文各建一次 datetime
+        extracted_at = datetime.now().isoformat()
+
+        posts = []
+        for raw in raw_posts:
+            data = self._postprocess(raw, extracted_at)
+            if data:
+                posts.append(data)
+
+        return posts
+
+    def _postprocess(self, raw: Dict, extracted_at: str) -> Optional[Dict]:
+        """
+        將 _SCAN_JS 回傳的原始資料轉成貼文資料
+
+        Args:
+            raw (Dict): {'text', 'href', 'idAttrs', 'time', 'author'}
+            extracted_at (str): 提取時間 (ISO 格式)
+
+        Returns:
+            Optional[Dict]: 貼文資料 (格式同 extract_post_data)，若被過濾則為 None
+        """
+        try:
+            url = self._clean_url(raw['href'])
+
+            # 留言的永久連結包含 ?comment 參數
+            if url and '?comment' in url:
+                self.logger.debug("跳過：這是留言，不是主貼文 (URL: %.80s)", url)
+                return None
+
+            text = raw['text'] or ""
+            if len(text.strip()) < 5:
+                self.logger.debug("跳過：貼文文本過短 (僅 %d 字元): '%.50s'", len(text), text)
+                return None
+
+            time_attrs = raw['time'] or {}
 
             return {
-                'id': post_id,
+                'id': self._resolve_post_id(url, raw['idAttrs'], text),
                 'text': text,
                 'url': url,
-                'timestamp': timestamp,
-                'author': author,
-                'extracted_at': datetime.now().isoformat()
+                'timestamp': self._parse_timestamp(
+                    time_attrs.get('utime'), time_attrs.get('datetime'), time_attrs.get('title')
+                ),
+                'author': raw['author'] or None,
+                'extracted_at': extracted_at
             }
 
         except Exception as e:
-            self.logger.error(f"提取貼文資料失敗: {e}", exc_info=True)
+            self.logger.error(f"處理貼文資料失敗: {e}", exc_info=True)
             return None
 
-    def _expand_see_more(self, element):
+    def extract_post_data(self, post_element) -> Optional[Dict]:
         """
-        展開「查看更多」按鈕，顯示完整貼文內容
+        從貼文元素提取所有需要的資料
 
         Args:
-            element: Playwright ElementHandle
+            post_element: Playwright ElementHandle
+
+        Returns:
+            Optional[Dict]: 貼文資料，若提取失敗則為 None
+            {
+                'id': str,          # 貼文唯一 ID
+                'text': str,        # 貼文文本內容
+                'url': str,         # 貼文連結
+                'timestamp': str,   # 發布時間 (如有)
+                'author': str,      # 作者 (如有)
+            }
         """
         try:
-            import time
-
-            # 多種「查看更多」的可能文字（支援多語言）
-            see_more_texts = [
-                'See more',
-                'See More',
-                '查看更多',
-                '顯示更多',
-                '显示更多',
-                'Xem thêm',  # 越南文
-                'もっと見る',  # 日文
-            ]
-
-            # 方法 1: 尋找所有可能的按鈕元素
-            button_selectors = [
-                'div[role="button"]',
-                'span[role="button"]',
-            ]
-
-            for btn_selector in button_selectors:
-                buttons = element.query_selector_all(btn_selector)
-                self.logger.debug(f"找到 {len(buttons)} 個按鈕元素 ({btn_selector})")
-
-                for i, button in enumerate(buttons):
-                    try:
-                        button_text = button.inner_text().strip()
-                        self.logger.debug(f"  按鈕 {i+1} 文字: '{button_text[:50]}'")
-
-                        # 檢查按鈕文字是否匹配
-                        if any(see_more in button_text for see_more in see_more_texts):
-                            if button.is_visible():
-                                self.logger.debug(f"✅ 找到「查看更多」按鈕: {button_text}")
-                                button.click()
-                                # 等待內容展開
-                                time.sleep(0.5)
-                                self.logger.debug("✅ 已展開貼文內容")
-                                return
-                    except Exception as e:
-                        self.logger.debug(f"  按鈕 {i+1} 檢查失敗: {e}")
-                        continue
-
-            # 方法 2: 使用 XPath 尋找包含特定文字的元素
-            for text in see_more_texts:
-                try:
-                    # 使用 XPath 來尋找包含特定文字的元素
-                    xpath = f".//*[@role='button' and contains(text(), '{text}')]"
-                    see_more_btn = element.query_selector(f'xpath={xpath}')
-                    if see_more_btn and see_more_btn.is_visible():
-                        self.logger.debug(f"找到「查看更多」按鈕 (XPath): {text}")
-                        see_more_btn.click()
-                        time.sleep(0.5)
-                        self.logger.debug("✅ 已展開貼文內容")
-                        return
-                except Exception:
-                    continue
-
-            # 如果沒有找到「查看更多」按鈕，表示內容已經是完整的
-            self.logger.debug("未找到「查看更多」按鈕，可能內容已完整展開")
+            # 1. 展開「查看更多」按鈕（如果有的話）
+            self._expand_see_more(post_element)
+
+            # 2. 一次讀取所有欄位，再於 Python 端過濾留言、過短文本
+            raw = self._scan_post(post_element)
+
+            # 同一批 (extract_posts) 的元素共用提取時間
+            return self._postprocess(raw, self._batch_ts or datetime.now().isoformat())
 
         except Exception as e:
-            self.logger.debug(f"展開「查看更多」失敗: {e}")
-            # 即使失敗也繼續，因為可能本來就沒有「查看更多」按鈕
+            self.logger.error(f"提取貼文資料失敗: {e}", exc_info=True)
+            return None
 
-    def _extract_text(self, element) -> str:
+    def _scan_post(self, element) -> Dict:
         """
-        提取貼文文本內容
+        一次 element.evaluate 讀取貼文元素的所有欄位
 
         Args:
             element: Playwright ElementHandle
 
         Returns:
-            str: 貼文文本
+            Dict: {'text', 'href', 'idAttrs', 'time', 'author'} (格式同 _EXTRACT_JS)
+        """
+        return element.evaluate(_SCAN_JS, self._SCAN_ARGS)
+
+    def _expand_see_more(self, element):
+        """
+        展開「查看更多」按鈕，顯示完整貼文內容
+
+        Args:
+            element: Playwright ElementHandle
         """
         try:
-            # Facebook 貼文內容的多種可能選擇器（優先順序從高到低）
-            selectors = [
-                # 新版 Facebook 選擇器
-                'div[data-ad-comet-preview="message"]',
-                'div[data-ad-preview="message"]',
-                '[data-ad-rendering-role="story_message"]',
-
-                # 通用選擇器 - 貼文內容通常在 dir="auto" 的 div 中
-                'div[dir="auto"][style*="text-align"]',
-
-                # 更寬鬆的選擇器
-                'div[dir="auto"]',
-            ]
-
-            # 先嘗試精確選擇器
-            for selector in selectors[:3]:
-                text_elem = element.query_selector(selector)
-                if text_elem:
-                    text = text_elem.inner_text()
-                    if text and len(text.strip()) > 10:
-                        self.logger.debug(f"✅ 使用 selector: {selector}, 提取到 {len(text)} 字元")
-                        return text.strip()
-
-            # 如果精確選擇器失敗，嘗試找所有 dir="auto" 的元素
-            # 通常第一個長文本就是貼文內容
-            all_divs = element.query_selector_all('div[dir="auto"]')
-            for div in all_divs:
-                text = div.inner_text()
-                if text and len(text.strip()) > 30:  # 至少要有 30 字元才算是貼文
-                    self.logger.debug(f"✅ 使用 fallback，提取到 {len(text)} 字元")
-                    return text.strip()
-
-            # 最終 fallback：獲取整個元素的文本（但這通常包含太多雜訊）
-            fallback_text = element.inner_text()
-            self.logger.debug(f"⚠️ 使用 full text fallback，提取到 {len(fallback_text)} 字元")
-
-            # 如果文本太短，記錄警告
-            if len(fallback_text.strip()) < 10:
-                self.logger.debug(f"❌ 提取的文本太短: '{fallback_text[:100]}'")
-
-            return fallback_text.strip() if fallback_text else ""
+            # 在瀏覽器內一次找到並點擊按鈕
+            clicked = element.evaluate(_EXPAND_JS, self._EXPAND_ARGS)
+
+            if clicked:
+                # 等待內容展開
+                time.sleep(0.5)
+                self.logger.debug("✅ 已展開貼文內容")
+            else:
+                # 如果沒有找到「查看更多」按鈕，表示內容已經是完整的
+                self.logger.debug("未找到「查看更多」按鈕，可能內容已完整展開")
 
         except Exception as e:
-            self.logger.debug(f"提取文本失敗: {e}")
-            return ""
+            self.logger.debug(f"展開「查看更多」失敗: {e}")
+            # 即使失敗也繼續，因為可能本來就沒有「查看更多」按鈕
 
-    def _extract_url(self, element) -> str:
+    @staticmethod
+    def _clean_url(href: Optional[str]) -> str:
         """
-        提取貼文永久連結
+        將連結 href 轉為完整的貼文 URL
 
         Args:
-            element: Playwright ElementHandle
+            href (str): 連結的 href 屬性
 
         Returns:
-            str: 貼文 URL
+            str: 貼文 URL，無法辨識時為空字串
         """
-        try:
-            # 尋找包含 /posts/ 或 /permalink/ 的連結
-            selectors = [
-                'a[href*="/posts/"]',
-                'a[href*="/permalink/"]',
-                'a[href*="story_fbid"]',
-            ]
-
-            for selector in selectors:
-                link = element.query_selector(selector)
-                if link:
-                    href = link.get_attribute('href')
-                    if href:
-                        # 補全為完整 URL
-                        if href.startswith('/'):
-                            return f"https://www.facebook.com{href}"
-                        elif href.startswith('http'):
-                            # 清理 URL 參數
-                            return href.split('?')[0]
-
+        if not href:
             return ""
 
-        except Exception as e:
-            self.logger.debug(f"提取 URL 失敗: {e}")
-            return ""
+        # 補全為完整 URL
+        if href.startswith('/'):
+            return f"https://www.facebook.com{href}"
+        elif href.startswith('http'):
+            # 清理 URL 參數
+            return href.split('?')[0]
 
-    def _extract_post_id(self, element, url: str, text: str) -> str:
+        return ""
+
+    def _resolve_post_id(self, url: str, attr_values, text: str) -> str:
         """
-        提取或生成貼文 ID
+        依 URL、元素屬性、內容 hash 的順序決定貼文 ID
 
         Args:
-            element: Playwright ElementHandle
             url (str): 貼文 URL
+            attr_values (Iterable[Optional[str]]): _ID_ATTRS 對應的屬性值
             text (str): 貼文文本
 
         Returns:
             str: 貼文 ID
         """
         try:
-            # 方法 1: 從 URL 提取 ID
+            # 方法 1: 從 URL 提取 ID (/posts/、/permalink/ 或 story_fbid 參數)
             if url:
-                # 嘗試從 URL 中提取數字 ID
-                # 例如: /posts/123456789 或 /permalink/123456789
-                match = re.search(r'/(?:posts|permalink)/(\d+)', url)
-                if match:
-                    return match.group(1)
-
-                # 嘗試從 story_fbid 參數提取
-                match = re.search(r'story_fbid=(\d+)', url)
-                if match:
-                    return match.group(1)
+                post_id = _post_id_from_url(url)
+                if post_id:
+                    return post_id
 
             # 方法 2: 從元素屬性提取
             # Facebook 有時會在 data 屬性中包含 ID
-            for attr in ['data-ft', 'data-testid', 'id']:
-                value = element.get_attribute(attr)
+            for value in attr_values:
                 if value:
                     # 嘗試從屬性值中提取數字
-                    match = re.search(r'\d{10,}', str(value))
+                    match = _LONG_DIGITS_RE.search(str(value))
                     if match:
                         return match.group(0)
 
             # 方法 3: 使用內容 hash 作為 ID (fallback)
-            # 使用文本前 500 字元生成 hash
-            content_sample = text[:500] if text else ""
-            content_hash = hashlib.md5(content_sample.encode('utf-8')).hexdigest()
-            return f"hash_{content_hash[:16]}"
+            # 對整篇文本計算 64-bit hash (只取開頭時，同一範本的貼文容易撞 ID)
+            # errors='ignore': 文本含孤立 surrogate 時仍可計算 (不會落到 unknown_ ID)
+            content = (text or '').encode('utf-8', 'ignore')
+            if xxhash is not None:
+                content_hash = xxhash.xxh3_64_hexdigest(content)
+            else:
+                content_hash = hashlib.blake2b(content, digest_size=8).hexdigest()
+            return f"hash_{content_hash}"
 
         except Exception as e:
             self.logger.debug(f"提取 ID 失敗: {e}")
             # 最終 fallback
             return f"unknown_{datetime.now().strftime('%Y%m%d%H%M%S')}"
 
-    def _extract_timestamp(self, element) -> Optional[str]:
+    def _parse_timestamp(self, utime: Optional[str], dt: Optional[str],
+                         title: Optional[str]) -> Optional[str]:
         """
-        提取貼文時間戳
+        由時間元素的屬性決定時間戳
 
         Args:
-            element: Playwright ElementHandle
+            utime (str): data-utime 屬性 (Unix timestamp)
+            dt (str): datetime 屬性
+            title (str): title 屬性 (完整日期)
 
         Returns:
             Optional[str]: 時間戳 (ISO 格式)
         """
         try:
-            # 尋找時間元素 (通常是 <abbr> 或 <time>)
-            time_elem = element.query_selector('abbr, time')
-            if time_elem:
-                # 嘗試獲取 data-utime 屬性 (Unix timestamp)
-                utime = time_elem.get_attribute('data-utime')
-                if utime:
-                    timestamp = datetime.fromtimestamp(int(utime))
-                    return timestamp.isoformat()
-
-                # 嘗試獲取 datetime 屬性
-                dt = time_elem.get_attribute('datetime')
-                if dt:
-                    return dt
-
-                # 嘗試獲取 title 屬性 (完整日期)
-                title = time_elem.get_attribute('title')
-                if title:
-                    return title
-
+            if utime:
+                return datetime.fromtimestamp(int(utime)).isoformat()
+        except (ValueError, OverflowError, OSError) as e:
+            self.logger.debug(f"解析 data-utime 失敗: {e}")
             return None
 
+        return dt or title or None
+
+
+class AsyncPostExtractor(PostExtractor):
+    """
+    非同步貼文提取器 (搭配 playwright.async_api)
+
+    純 Python 的後處理與 PostExtractor 共用，只有與瀏覽器溝通的方法改為 async。
+    逐元素提取時可用 extract_posts_parallel 同時處理多則貼文，重疊 IPC 等待時間。
+
+    使用方式:
+        extractor = AsyncPostExtractor(logger)
+
+        # 批次提取 (一次 page.evaluate)
+        posts = await extractor.extract_posts_data(page)
+
+        # 逐元素並行提取
+        elements = await extractor.extract_posts(page)
+        posts = await extractor.extract_posts_parallel(elements)
+    """
+
+    async def extract_posts(self, page) -> List:
+        """
+        提取頁面上所有可見的貼文元素
+
+        Args:
+            page: Playwright (async) Page 物件
+
+        Returns:
+            List: 貼文元素列表
+        """
+        try:
+            posts = await page.query_selector_all('[role="article"]')
+            self.logger.debug("找到 %d 個貼文元素", len(posts))
+            self._batch_ts = datetime.now().isoformat()
+            return posts
+
         except Exception as e:
-            self.logger.debug(f"提取時間戳失敗: {e}")
-            return None
+            self.logger.error(f"提取貼文列表失敗: {e}", exc_info=True)
+            return []
 
-    def _extract_author(self, element) -> Optional[str]:
+    async def warmup(self, page):
         """
-        提取貼文作者
+        在頁面中預先安裝批次提取用的 JavaScript 函式
 
         Args:
-            element: Playwright ElementHandle
+            page: Playwright (async) Page 物件
+        """
+        await page.evaluate(_INSTALL_JS)
+
+    async def _call(self, page, name: str, args: Dict):
+        """呼叫 warmup 安裝的函式 (尚未安裝時先安裝)"""
+        result = await page.evaluate(_CALL_JS, {'name': name, 'args': args})
+        if result is None:
+            await self.warmup(page)
+            result = await page.evaluate(_CALL_JS, {'name': name, 'args': args})
+        return result
+
+    async def extract_posts_data(self, page) -> List[Dict]:
+        """
+        一次 page.evaluate 提取頁面上所有貼文的資料
+
+        Args:
+            page: Playwright (async) Page 物件
 
         Returns:
-            Optional[str]: 作者名稱
+            List[Dict]: 貼文資料列表 (已過濾留言與過短的貼文)
         """
         try:
-            # 尋找作者連結
-            author_link = element.query_selector('a[role="link"]')
-            if author_link:
-                # 通常作者名稱在第一個連結的 aria-label 或文本中
-                author_name = author_link.inner_text()
-                if author_name and len(author_name.strip()) > 0:
-                    return author_name.strip()
+            raw_posts = await self._call(page, 'extract', self._EXTRACT_ARGS)
+        except Exception as e:
+            self.logger.error(f"批次提取貼文失敗: {e}", exc_info=True)
+            return []
 
-            return None
+        return self._postprocess_all(raw_posts)
 
+    async def scroll_and_extract(self, page, delay: float,
+                                max_wait: Optional[float] = None) -> Tuple[List[Dict], bool]:
+        """
+        滾動到底部、等待新內容後提取所有貼文 (一次 page.evaluate)
+
+        至少等待 delay 秒；之後新貼文一出現 (或頁面高度增加) 就提取，
+        最多等待 max_wait 秒 (預設 delay + 2)。
+
+        Args:
+            page: Playwright (async) Page 物件
+            delay (float): 滾動後最少等待時間 (秒)
+            max_wait (float, optional): 滾動後最多等待時間 (秒)
+
+        Returns:
+            Tuple[List[Dict], bool]: (貼文資料列表, 是否有新內容載入)
+        """
+        try:
+            result = await self._call(page, 'scrollExtract', self._scroll_args(delay, max_wait))
         except Exception as e:
-            self.logger.debug(f"提取作者失敗: {e}")
+            self.logger.error(f"滾動提取貼文失敗: {e}", exc_info=True)
+            return [], False
+
+        return self._postprocess_all(result['posts']), self._grew(result)
+
+    async def extract_posts_parallel(self, post_elements: List) -> List[Dict]:
+        """
+        以 asyncio.gather 同時提取多則貼文
+
+        Args:
+            post_elements (List): Playwright (async) ElementHandle 列表
+
+        Returns:
+            List[Dict]: 貼文資料列表 (依元素順序，已過濾失敗與被過濾的貼文)
+        """
+        results = await asyncio.gather(
+            *(self.extract_post_data(element) for element in post_elements),
+            return_exceptions=True
+        )
+
+        posts = []
+        for result in results:
+            if isinstance(result, BaseException):
+                self.logger.error(f"提取貼文資料失敗: {result}")
+            elif result:
+                posts.append(result)
+
+        return posts
+
+    async def extract_post_data(self, post_element) -> Optional[Dict]:
+        """
+        從貼文元素提取所有需要的資料
+
+        Args:
+            post_element: Playwright (async) ElementHandle
+
+        Returns:
+            Optional[Dict]: 貼文資料 (格式同 PostExtractor.extract_post_data)
+        """
+        try:
+            await self._expand_see_more(post_element)
+            raw = await self._scan_post(post_element)
+            # 同一批 (extract_posts) 的元素共用提取時間
+            return self._postprocess(raw, self._batch_ts or datetime.now().isoformat())
+
+        except Exception as e:
+            self.logger.error(f"提取貼文資料失敗: {e}", exc_info=True)
             return None
 
+    async def _scan_post(self, element) -> Dict:
+        """
+        一次 element.evaluate 讀取貼文元素的所有欄位
+
+        Args:
+            element: Playwright (async) ElementHandle
+
+        Returns:
+            Dict: {'text', 'href', 'idAttrs', 'time', 'author'}
+        """
+        return await element.evaluate(_SCAN_JS, self._SCAN_ARGS)
+
+    async def _expand_see_more(self, element):
+        """
+        展開「查看更多」按鈕 (等待期間不阻塞其他貼文)
+
+        Args:
+            element: Playwright (async) ElementHandle
+        """
+        try:
+            clicked = await element.evaluate(_EXPAND_JS, self._EXPAND_ARGS)
+
+            if clicked:
+                await asyncio.sleep(0.5)
+                self.logger.debug("✅ 已展開貼文內容")
+            else:
+                self.logger.debug("未找到「查看更多」按鈕，可能內容已完整展開")
+
+        except Exception as e:
+            self.logger.debug(f"展開「查看更多」失敗: {e}")
+
+
+def make_extractor(logger=None, use_async: bool = False) -> PostExtractor:
+    """
+    建立 PostExtractor
+
+    Args:
+        logger: ScraperLogger 或 logging.Logger (預設使用 'scraper' logger)
+        use_async (bool): 是否建立 AsyncPostExtractor (搭配 playwright.async_api)
+
+    Returns:
+        PostExtractor: 貼文提取器
+    """
+    if logger is None:
+        logger = logging.getLogger('scraper')
+    if use_async:
+        return AsyncPostExtractor(logger)
+    return PostExtractor(logger)
+
 
 # 測試程式碼
 if __name__ == '__main__':
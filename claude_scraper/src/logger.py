@@ -7,14 +7,31 @@
 - 錯誤日誌單獨記錄
 - Console 輸出
 - 自動日誌檔案輪替
+- 背景執行緒寫入 (QueueHandler + QueueListener)，不阻塞爬蟲主流程
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import sys
 from datetime import datetime
 from pathlib import Path
 
 
+class _LocalQueueHandler(logging.handlers.QueueHandler):
+    """
+    同一行程內使用的 QueueHandler
+
+    預設的 prepare() 會在呼叫端執行緒先格式化訊息 (供跨行程傳遞)，
+    這裡直接放入原始 record，格式化交給背景執行緒處理。
+    """
+
+    def prepare(self, record):
+        return record
+
+
 class ScraperLogger:
     """
     爬蟲日誌系統
@@ -22,7 +39,9 @@ class ScraperLogger:
     使用方式:
         logger = ScraperLogger('logs/')
         logger.info("開始執行爬蟲")
+        logger.debug("提取到 %d 字元", len(text))  # %-style 參數在需要時才格式化
         logger.error("發生錯誤", exc_info=True)
+        logger.close()
     """
 
     def __init__(self, log_dir='logs/'):
@@ -53,21 +72,32 @@ class ScraperLogger:
         self.logger.handlers.clear()
 
         # 1. 完整日誌 Handler (所有等級)
+        # delay=True: 第一筆記錄寫入時才開啟檔案
         fh_all = logging.FileHandler(
             self.main_log_file,
-            encoding='utf-8'
+            encoding='utf-8',
+            delay=True
         )
         fh_all.setLevel(logging.DEBUG)
 
-        # 2. 錯誤日誌 Handler (只記錄 ERROR 以上)
+        # 以 MemoryHandler 緩衝，累積 1024 筆才寫入一次 (ERROR 以上立即寫出)
+        buffered_all = logging.handlers.MemoryHandler(
+            1024,
+            flushLevel=logging.ERROR,
+            target=fh_all
+        )
+        buffered_all.setLevel(logging.DEBUG)
+
+        # 2. 錯誤日誌 Handler (只記錄 ERROR 以上，每筆都立即寫出，不需緩衝)
         fh_error = logging.FileHandler(
             self.error_log_file,
-            encoding='utf-8'
+            encoding='utf-8',
+            delay=True
         )
         fh_error.setLevel(logging.ERROR)
 
         # 3. Console Handler (INFO 以上)
-        ch = logging.StreamHandler()
+        ch = logging.StreamHandler(self._open_console_stream())
         ch.setLevel(logging.INFO)
 
         # 設定格式
@@ -82,9 +112,21 @@ class ScraperLogger:
         ch.setFormatter(formatter)
 
         # 添加 handlers
-        self.logger.addHandler(fh_all)
-        self.logger.addHandler(fh_error)
-        self.logger.addHandler(ch)
+        # logger 只掛 QueueHandler，實際的格式化與寫入由背景執行緒處理
+        self._queue = queue.Queue(-1)
+        self.logger.addHandler(_LocalQueueHandler(self._queue))
+
+        self._listener = logging.handlers.QueueListener(
+            self._queue, buffered_all, fh_error, ch,
+            respect_handler_level=True
+        )
+        self._listener.start()
+        self._buffered = buffered_all
+        # 關閉順序: 先關閉緩衝 (寫出剩餘記錄)，再關閉檔案
+        self._handlers = (buffered_all, fh_all, fh_error, ch)
+
+        # 程式結束時確保佇列中的訊息都已寫出
+        atexit.register(self.close)
 
         # 記錄初始化訊息
         self.logger.info("=" * 60)
@@ -93,52 +135,80 @@ class ScraperLogger:
         self.logger.info(f"Error log: {self.error_log_file}")
         self.logger.info("=" * 60)
 
-    def debug(self, message):
+    @staticmethod
+    def _open_console_stream():
+        """
+        開啟 Console 輸出串流 (UTF-8、以行為單位緩衝)
+
+        直接寫 stderr 的檔案描述子，一行只需一次 write；closefd=False 確保
+        關閉或回收時不會連帶關閉 stderr。stderr 沒有檔案描述子時 (例如被
+        測試框架替換) 改用 sys.stderr。
+
+        Returns:
+            TextIO: Console 串流
+        """
+        try:
+            return os.fdopen(
+                sys.stderr.fileno(), 'w',
+                buffering=1,
+                encoding='utf-8',
+                errors='replace',
+                closefd=False
+            )
+        except (AttributeError, OSError, ValueError):
+            return sys.stderr
+
+    def debug(self, message, *args):
         """
         記錄 DEBUG 等級訊息
 
         Args:
-            message (str): 訊息內容
+            message (str): 訊息內容 (可使用 %-style 格式)
+            *args: 格式化參數
         """
-        self.logger.debug(message)
+        self.logger.debug(message, *args)
 
-    def info(self, message):
+    def info(self, message, *args):
         """
         記錄 INFO 等級訊息
 
         Args:
-            message (str): 訊息內容
+            message (str): 訊息內容 (可使用 %-style 格式)
+            *args: 格式化參數
         """
-        self.logger.info(message)
+        self.logger.info(message, *args)
 
-    def warning(self, message):
+    def warning(self, message, *args):
         """
         記錄 WARNING 等級訊息
 
         Args:
-            message (str): 訊息內容
+            message (str): 訊息內容 (可使用 %-style 格式)
+            *args: 格式化參數
         """
-        self.logger.warning(message)
+        self.logger.warning(message, *args)
 
-    def error(self, message, exc_info=False):
+    def error(self, message, *args, exc_info=False):
         """
         記錄 ERROR 等級訊息
 
         Args:
-            message (str): 訊息內容
+            message (str): 訊息內容 (可使用 %-style 格式)
+            *args: 格式化參數
             exc_info (bool): 是否包含完整的 exception 追蹤
         """
-        self.logger.error(message, exc_info=exc_info)
+        self.logger.error(message, *args, exc_info=exc_info)
 
-    def critical(self, message, exc_info=False):
+    def critical(self, message, *args, exc_info=False):
         """
         記錄 CRITICAL 等級訊息
 
         Args:
-            message (str): 訊息內容
+            message (str): 訊息內容 (可使用 %-style 格式)
+            *args: 格式化參數
             exc_info (bool): 是否包含完整的 exception 追蹤
         """
-        self.logger.critical(message, exc_info=exc_info)
+        self.logger.critical(message, *args, exc_info=exc_info)
 
     def separator(self, char='-', length=60):
         """
@@ -161,6 +231,29 @@ class ScraperLogger:
         self.logger.info(title)
         self.separator('=')
 
+    def flush(self):
+        """
+        等待佇列中的訊息處理完畢，並將緩衝的記錄寫入檔案
+        """
+        if self._listener is None:
+            return
+
+        self._queue.join()
+        self._buffered.flush()
+
+    def close(self):
+        """
+        停止背景寫入執行緒並關閉日誌檔案 (會先寫出佇列與緩衝中剩餘的訊息)
+        """
+        if self._listener is None:
+            return
+
+        self._listener.stop()
+        self._listener = None
+
+        for handler in self._handlers:
+            handler.close()
+
 
 # 測試程式碼
 if __name__ == '__main__':
@@ -171,6 +264,7 @@ if __name__ == '__main__':
 
     # 測試各種等級
     logger.debug("這是 DEBUG 訊息 (只會出現在檔案)")
+    logger.debug("這是 %s-style 的 DEBUG 訊息 (%d)", "%", 42)
     logger.info("這是 INFO 訊息")
     logger.warning("這是 WARNING 訊息")
     logger.error("這是 ERROR 訊息")
@@ -179,12 +273,18 @@ if __name__ == '__main__':
     logger.section("測試區段")
     logger.info("區段內的訊息")
 
+    # 測試 flush (緩衝中的記錄寫入檔案)
+    logger.flush()
+    assert logger.main_log_file.read_text(encoding='utf-8').count('區段內的訊息') == 1
+
     # 測試 exception 記錄
     try:
         result = 1 / 0
     except Exception as e:
         logger.error("發生錯誤", exc_info=True)
 
+    logger.close()
+
     print(f"\n✅ 測試完成！")
     print(f"請檢查 test_logs/ 目錄:")
     print(f"- scraper_{datetime.now().strftime('%Y%m%d')}.log (完整日誌)")
@@ -3,18 +3,25 @@
 資料儲存模組
 
 負責將抓取到的貼文資料儲存到檔案，提供：
-- 儲存原始貼文到 JSONL
+- 儲存原始貼文到 JSONL (可選 gzip 壓縮的 .jsonl.gz)
 - 檔案鎖定機制 (防止併發寫入衝突)
 - 自動建立目錄
 - 按日期分檔
 """
 
+import atexit
+import gzip
 import json
 import os
 import fcntl
 from datetime import datetime
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List
+
+try:
+    import orjson  # 選用：較快的 JSON 序列化/解析
+except ImportError:
+    orjson = None
 
 
 class PostSaver:
@@ -25,27 +32,155 @@ class PostSaver:
         saver = PostSaver(data_dir='data/', logger=logger)
         result = saver.save_post(post_data)
         print(f"已儲存: {result['filepath']}")
+
+        # 批次寫入 (單一 write)
+        results = saver.save_posts([post_a, post_b])
+
+        # 單一寫入者可暫存多則再寫入，結束前需 close() (atexit 也會自動寫出)
+        saver = PostSaver('data/', logger, single_writer=True, flush_every=50)
+        saver.save_post(post_data)
+        saver.close()
+
+        # 輸出 gzip 壓縮的 .jsonl.gz (每次寫入為一個 gzip member，建議搭配 flush_every)
+        saver = PostSaver('data/', logger, single_writer=True, flush_every=50, compress=True)
     """
 
-    def __init__(self, data_dir: str, logger):
+    def __init__(self, data_dir: str, logger, single_writer: bool = False,
+                 flush_every: int = 1, compress: bool = False):
         """
         初始化儲存器
 
         Args:
             data_dir (str): 資料目錄路徑
             logger: ScraperLogger 物件
+            single_writer (bool): 是否只有此程序寫入資料目錄 (是則不使用檔案鎖)
+            flush_every (int): 累積幾則貼文才寫入一次 (只在 single_writer 時生效，
+                               多程序寫入時序號必須在檔案鎖內決定，因此每則立即寫入)
+            compress (bool): 是否寫入 gzip 壓縮的 .jsonl.gz (讀取時兩種格式皆支援)
         """
         self.data_dir = Path(data_dir)
         self.logger = logger
+        self.single_writer = single_writer
+        self.flush_every = flush_every if single_writer else 1
+        self.compress = compress
+
+        # 各日期檔案的 (記錄數, 檔案大小)，檔案大小不變時不必重新計算記錄數
+        self._seq_by_date = {}
+
+        # 尚未寫入的記錄 (bytes)、其貼文 ID 與日期
+        self._pending = []
+        self._pending_ids = []
+        self._pending_date = None
+
+        # 已寫入檔案、尚未由 take_written_ids() 取走的貼文 ID
+        self._written_ids = []
 
         # 確保資料目錄存在
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.logger.info(f"資料目錄: {self.data_dir}")
 
+        # 程式結束時寫出暫存的記錄
+        atexit.register(self.flush)
+
+    def _filepath(self, date: str, compress: bool = None) -> Path:
+        """取得指定日期的 JSONL 檔案路徑 (預設為目前寫入的格式)"""
+        if compress is None:
+            compress = self.compress
+        suffix = '.jsonl.gz' if compress else '.jsonl'
+        return self.data_dir / f"{date}_raw_posts{suffix}"
+
+    def _encode(self, buf: bytes) -> bytes:
+        """
+        編碼要寫入的資料
+
+        壓縮模式下每次寫入獨立成一個 gzip member 附加到檔尾
+        (多個 member 串接仍是合法的 gzip 檔)，維持單一 O_APPEND write。
+        """
+        if self.compress:
+            return gzip.compress(buf, compresslevel=1, mtime=0)
+        return buf
+
+    def _format_record(self, post_data: Dict, today: str, sequence: int):
+        """
+        產生一筆記錄
+
+        Args:
+            post_data (Dict): 貼文資料
+            today (str): 日期 (YYYY-MM-DD)
+            sequence (int): 序號
+
+        Returns:
+            Tuple[Dict, bytes]: (save_post 的返回結果, 要寫入的一行 JSON)
+        """
+        record_id = f"{today}-{sequence:03d}"
+
+        # 準備資料
+        data = {
+            'record_id': record_id,
+            'sequence': sequence,
+            'post_id': post_data.get('id'),
+            'text': post_data.get('text'),
+            'url': post_data.get('url'),
+            'author': post_data.get('author'),
+            'timestamp': post_data.get('timestamp'),
+            'extracted_at': post_data.get('extracted_at'),
+            'saved_at': datetime.now().isoformat()
+        }
+        if orjson is not None:
+            line = orjson.dumps(data) + b'\n'
+        else:
+            line = (json.dumps(data, ensure_ascii=False) + '\n').encode('utf-8')
+
+        result = {
+            'success': True,
+            'filepath': str(self._filepath(today)),
+            'record_id': record_id,
+            'sequence': sequence
+        }
+        return result, line
+
+    def _current_count(self, today: str, size: int) -> int:
+        """
+        取得檔案中已寫入的記錄數
+
+        Args:
+            today (str): 日期 (YYYY-MM-DD)
+            size (int): 目前的檔案大小
+
+        Returns:
+            int: 記錄數
+        """
+        # 檔案大小與上次寫入後相同 → 沿用快取；否則 (首次寫入或被其他程序寫入) 重新計算
+        cached = self._seq_by_date.get(today)
+        if cached is not None and cached[1] == size:
+            return cached[0]
+
+        filepath = self._filepath(today)
+        count = self._count_records(filepath) if size else 0
+
+        # 同一天另一種格式的檔案 (切換壓縮設定前寫入的)，序號接續其後
+        other = self._filepath(today, not self.compress)
+        if other.exists():
+            count += self._count_records(other)
+        self._seq_by_date[today] = (count, size)
+        return count
+
+    @staticmethod
+    def _write_all(fd: int, buf: bytes):
+        """以 os.write 寫入完整的 buffer (處理部分寫入)"""
+        view = memoryview(buf)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+
     def save_post(self, post_data: Dict) -> Dict:
         """
         儲存貼文到 JSONL 檔案
 
+        flush_every > 1 時先放入暫存，累積到指定數量 (或呼叫 flush/close) 才寫入；
+        此時返回的 success 只表示已暫存 (staged 為 True)，尚未寫到檔案。
+        寫入檔案的貼文 ID 由 take_written_ids() 取得，應在寫入後才標記為已處理。
+
         Args:
             post_data (Dict): 貼文資料
 
@@ -54,67 +189,176 @@ class PostSaver:
                 'success': bool,
                 'filepath': str,
                 'record_id': str,
-                'sequence': int
+                'sequence': int,
+                'staged': bool  # True: 只在暫存中，尚未寫入檔案
             }
         """
+        if self.flush_every <= 1:
+            return self.save_posts([post_data])[0]
+
         try:
+            today = datetime.now().strftime('%Y-%m-%d')
+
+            # 換日時先寫出前一天的暫存
+            if self._pending_date not in (None, today):
+                self.flush()
+
+            filepath = self._filepath(today)
+            size = filepath.stat().st_size if filepath.exists() else 0
+            sequence = self._current_count(today, size) + len(self._pending) + 1
+
+            result, line = self._format_record(post_data, today, sequence)
+            self._pending.append(line)
+            self._pending_ids.append(post_data.get('id'))
+            self._pending_date = today
+            self.logger.debug("✅ 已暫存: %s", result['record_id'])
+
+            result['staged'] = True
+            if len(self._pending) >= self.flush_every:
+                self.flush()
+                result['staged'] = False
+
+            return result
+
+        except Exception as e:
+            self.logger.error(f"儲存貼文失敗: {e}", exc_info=True)
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    def save_posts(self, posts: List[Dict]) -> List[Dict]:
+        """
+        一次儲存多則貼文 (單一 write 寫入)
+
+        Args:
+            posts (List[Dict]): 貼文資料列表
+
+        Returns:
+            List[Dict]: 每則貼文的儲存結果 (格式同 save_post)
+        """
+        try:
+            # 先寫出暫存，維持序號順序
+            self.flush()
+
             # 取得今天的檔案路徑
             today = datetime.now().strftime('%Y-%m-%d')
-            filepath = self.data_dir / f"{today}_raw_posts.jsonl"
+            filepath = self._filepath(today)
 
-            # 使用檔案鎖定機制安全寫入
-            with open(filepath, 'a+', encoding='utf-8') as f:
+            # 使用檔案鎖定機制安全寫入 (O_APPEND，寫入一律在檔尾)
+            fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
                 # 鎖定檔案
-                fcntl.flock(f, fcntl.LOCK_EX)
+                if not self.single_writer:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
 
                 try:
                     # 讀取現有記錄數量
-                    f.seek(0)
-                    count = sum(1 for line in f if line.strip())
-
-                    # 計算序號
-                    sequence = count + 1
-                    record_id = f"{today}-{sequence:03d}"
-
-                    # 準備資料
-                    data = {
-                        'record_id': record_id,
-                        'sequence': sequence,
-                        'post_id': post_data.get('id'),
-                        'text': post_data.get('text'),
-                        'url': post_data.get('url'),
-                        'author': post_data.get('author'),
-                        'timestamp': post_data.get('timestamp'),
-                        'extracted_at': post_data.get('extracted_at'),
-                        'saved_at': datetime.now().isoformat()
-                    }
+                    size = os.fstat(fd).st_size
+                    count = self._current_count(today, size)
+
+                    results = []
+                    lines = []
+                    for i, post_data in enumerate(posts):
+                        result, line = self._format_record(post_data, today, count + i + 1)
+                        results.append(result)
+                        lines.append(line)
 
                     # 寫入檔案
-                    f.write(json.dumps(data, ensure_ascii=False) + '\n')
+                    buf = self._encode(b''.join(lines))
+                    self._write_all(fd, buf)
+                    self._seq_by_date[today] = (count + len(lines), size + len(buf))
+                    self._written_ids.extend(post_data.get('id') for post_data in posts)
 
-                    self.logger.debug(f"✅ 已儲存: {record_id}")
+                    for result in results:
+                        result['staged'] = False
+                        self.logger.debug("✅ 已儲存: %s", result['record_id'])
 
-                    return {
-                        'success': True,
-                        'filepath': str(filepath),
-                        'record_id': record_id,
-                        'sequence': sequence
-                    }
+                    return results
 
                 finally:
                     # 解鎖檔案
-                    fcntl.flock(f, fcntl.LOCK_UN)
+                    if not self.single_writer:
+                        fcntl.flock(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
 
         except Exception as e:
             self.logger.error(f"儲存貼文失敗: {e}", exc_info=True)
-            return {
-                'success': False,
-                'error': str(e)
-            }
+            return [{'success': False, 'error': str(e)} for _ in posts]
+
+    def flush(self):
+        """
+        寫出暫存的記錄 (只在 single_writer 模式下會有暫存)
+        """
+        if not self._pending:
+            return
+
+        filepath = self._filepath(self._pending_date)
+        buf = self._encode(b''.join(self._pending))
+
+        fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            size = os.fstat(fd).st_size
+            self._write_all(fd, buf)
+        finally:
+            os.close(fd)
+
+        count = self._current_count(self._pending_date, size) + len(self._pending)
+        self._seq_by_date[self._pending_date] = (count, size + len(buf))
+        self._written_ids.extend(self._pending_ids)
+        self.logger.debug("💾 寫入 %d 筆暫存記錄", len(self._pending))
+
+        self._pending = []
+        self._pending_ids = []
+        self._pending_date = None
+
+    def take_written_ids(self) -> List[str]:
+        """
+        取走上次呼叫之後已寫入檔案的貼文 ID
+
+        Returns:
+            List[str]: 貼文 ID (依寫入順序)
+        """
+        written, self._written_ids = self._written_ids, []
+        return written
+
+    def close(self):
+        """寫出暫存的記錄"""
+        self.flush()
+
+    @staticmethod
+    def _open_records(filepath: Path):
+        """以二進位模式開啟 .jsonl 或 .jsonl.gz"""
+        if filepath.suffix == '.gz':
+            return gzip.open(filepath, 'rb')
+        return open(filepath, 'rb')
+
+    @classmethod
+    def _count_records(cls, filepath: Path) -> int:
+        """
+        計算 JSONL 檔案中的記錄數
+
+        直接計算位元組中的換行數，不逐行解碼 (每筆記錄固定以換行結尾，
+        最後一行缺少換行時也計入)；.jsonl.gz 先解壓再計算
+
+        Args:
+            filepath (Path): 檔案路徑
+
+        Returns:
+            int: 記錄數
+        """
+        with cls._open_records(filepath) as f:
+            data = f.read()
+
+        count = data.count(b'\n')
+        if data and not data.endswith(b'\n'):
+            count += 1
+        return count
 
     def get_stats(self) -> Dict:
         """
-        取得儲存統計資訊
+        取得儲存統計資訊 (會先寫出暫存的記錄)
 
         Returns:
             Dict: {
@@ -124,21 +368,24 @@ class PostSaver:
             }
         """
         try:
+            self.flush()
+
             files_info = []
             total_posts = 0
 
-            # 遍歷所有 JSONL 檔案
-            for filepath in sorted(self.data_dir.glob('*_raw_posts.jsonl')):
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    count = sum(1 for line in f if line.strip())
-                    total_posts += count
+            # 遍歷所有 JSONL 檔案 (含壓縮的 .jsonl.gz)
+            filepaths = [*self.data_dir.glob('*_raw_posts.jsonl'),
+                         *self.data_dir.glob('*_raw_posts.jsonl.gz')]
+            for filepath in sorted(filepaths):
+                count = self._count_records(filepath)
+                total_posts += count
 
-                    files_info.append({
-                        'filename': filepath.name,
-                        'date': filepath.stem.split('_')[0],
-                        'count': count,
-                        'size': filepath.stat().st_size
-                    })
+                files_info.append({
+                    'filename': filepath.name,
+                    'date': filepath.name.split('_')[0],
+                    'count': count,
+                    'size': filepath.stat().st_size
+                })
 
             return {
                 'total_files': len(files_info),
@@ -168,17 +415,25 @@ class PostSaver:
             if date is None:
                 date = datetime.now().strftime('%Y-%m-%d')
 
-            filepath = self.data_dir / f"{date}_raw_posts.jsonl"
+            self.flush()
+
+            # 兩種格式都可能存在 (切換壓縮設定的當天)，依寫入先後讀取
+            filepaths = [path for path in (self._filepath(date, not self.compress),
+                                           self._filepath(date))
+                         if path.exists()]
 
-            if not filepath.exists():
-                self.logger.warning(f"檔案不存在: {filepath}")
+            if not filepaths:
+                self.logger.warning(f"檔案不存在: {self._filepath(date)}")
                 return []
 
+            loads = orjson.loads if orjson is not None else json.loads
+
             posts = []
-            with open(filepath, 'r', encoding='utf-8') as f:
-                for line in f:
-                    if line.strip():
-                        posts.append(json.loads(line))
+            for filepath in filepaths:
+                with self._open_records(filepath) as f:
+                    for line in f:
+                        if line.strip():
+                            posts.append(loads(line))
 
             self.logger.info(f"載入 {len(posts)} 筆貼文 ({date})")
             return posts
@@ -246,5 +501,28 @@ if __name__ == '__main__':
     if posts:
         print(f"第一筆: {posts[0]['record_id']}")
 
+    # 測試 5: 批次寫入與暫存
+    print("\n[測試 5] 批次寫入與暫存")
+    results = saver.save_posts([test_post, test_post2])
+    print(f"✅ 批次寫入序號: {[r['sequence'] for r in results]}")
+
+    buffered = PostSaver('test_data/', logger, single_writer=True, flush_every=3)
+    results = [buffered.save_post(test_post) for _ in range(4)]
+    sequences = [r['sequence'] for r in results]
+    assert [r['staged'] for r in results] == [True, True, False, True]
+    assert len(buffered.take_written_ids()) == 3  # 第 4 則仍在暫存中
+    buffered.close()
+    assert buffered.take_written_ids() == [test_post['id']]
+    print(f"✅ 暫存寫入序號: {sequences}，寫入後才回報貼文 ID")
+    print(f"總貼文數: {buffered.get_stats()['total_posts']} (應為 {sequences[-1]})")
+
+    # 測試 6: gzip 壓縮輸出
+    print("\n[測試 6] gzip 壓縮輸出")
+    compressed = PostSaver('test_data/', logger, single_writer=True, flush_every=3, compress=True)
+    sequences = [compressed.save_post(test_post)['sequence'] for _ in range(4)]
+    compressed.close()
+    print(f"✅ 壓縮寫入序號: {sequences} (接續 .jsonl)")
+    print(f"載入: {len(compressed.load_posts_by_date())} 筆 (應為 {sequences[-1]})")
+
     print("\n✅ 所有測試完成！")
     print(f"請檢查 test_data/ 目錄")
@@ -12,8 +12,8 @@ Facebook 租屋爬蟲主程式
 """
 
 import sys
-import time
 import signal
+import threading
 from pathlib import Path
 from typing import Optional
 
@@ -24,7 +24,7 @@ from config import Config
 from logger import ScraperLogger
 from state_manager import StateManager
 from browser import BrowserController
-from extractor import PostExtractor
+from extractor import make_extractor
 from saver import PostSaver
 
 
@@ -52,23 +52,47 @@ class FacebookScraper:
         self.logger.section("Facebook 租屋爬蟲 - Claude Scraper v1.0")
 
         # 初始化其他模組
-        self.state = StateManager(self.config.state_file)
+        self.state = StateManager(self.config.state_file, bounded=self.config.bounded_dedup)
         self.browser = BrowserController(self.config, self.logger)
-        self.extractor = PostExtractor(self.logger)
-        self.saver = PostSaver(self.config.data_dir, self.logger)
+        self.extractor = make_extractor(self.logger)
+        self.saver = PostSaver(
+            self.config.data_dir, self.logger,
+            single_writer=self.config.single_writer,
+            flush_every=self.config.save_flush_every,
+            compress=self.config.save_compress
+        )
 
         # Session 相關
         self.session_id: Optional[str] = None
-        self.is_running = True
+
+        # 已暫存、尚未寫入檔案的貼文 ID (寫入後由 _mark_saved 標記為已處理)
+        self._staged_ids = set()
+
+        # 停止旗標: 信號處理函式設定，迴圈在每則貼文與每次等待之間檢查
+        self._stop = threading.Event()
 
         # 註冊中斷信號處理
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
 
+    @property
+    def is_running(self) -> bool:
+        """尚未收到中斷信號"""
+        return not self._stop.is_set()
+
     def _signal_handler(self, signum, frame):
-        """處理中斷信號 (Ctrl+C)"""
-        self.logger.warning("\n⚠️  收到中斷信號，正在安全關閉...")
-        self.is_running = False
+        """
+        處理中斷信號 (Ctrl+C)
+
+        第一次: 設定停止旗標，目前的貼文處理完後安全結束
+        第二次: 立即中斷 (包含進行中的 page.evaluate)，由 run() 以 interrupted 結束 session
+        """
+        if self._stop.is_set():
+            self.logger.warning("\n⚠️  再次收到中斷信號，立即停止")
+            raise KeyboardInterrupt
+
+        self.logger.warning("\n⚠️  收到中斷信號，正在安全關閉... (再按一次 Ctrl+C 立即停止)")
+        self._stop.set()
 
     def run(self):
         """
@@ -95,14 +119,13 @@ class FacebookScraper:
             # 3. 導航到目標社團
             self.logger.info("步驟 3: 導航到目標社團")
             self.browser.goto(self.config.group_url)
+            # goto 只等到 ready_selector (逾時不報錯)；確保 DOM 已載入再操作頁面
+            self.browser.page.wait_for_load_state('domcontentloaded')
 
-            # 等待頁面載入
-            time.sleep(3)
-
-            # 3.5. 滾動到頁面頂部並刷新，確保從乾淨狀態開始
+            # 3.5. 滾動到頁面頂部，確保從乾淨狀態開始
             self.logger.info("步驟 3.5: 準備頁面")
             self.browser.page.evaluate("window.scrollTo(0, 0)")
-            time.sleep(1)
+            self.extractor.warmup(self.browser.page)
 
             # 4. 檢查登入狀態
             self.logger.info("步驟 4: 檢查登入狀態")
@@ -125,7 +148,9 @@ class FacebookScraper:
             self.logger.info("步驟 5: 開始爬取貼文")
             self._scraping_loop()
 
-            # 6. 結束
+            # 6. 結束 (先寫出暫存的貼文並標記為已處理)
+            self.saver.flush()
+            self._mark_saved()
             self.state.end_session(self.session_id, 'completed')
             self.logger.separator()
             self.logger.info("✅ 爬取完成")
@@ -144,9 +169,32 @@ class FacebookScraper:
             # 關閉瀏覽器
             self.browser.close()
 
+            # 寫出暫存的貼文，寫入後才標記為已處理 (寫入失敗的不標記，下次重新抓取)
+            try:
+                self.saver.close()
+            except Exception as e:
+                self.logger.error(f"寫出暫存貼文失敗: {e}", exc_info=True)
+            self._mark_saved()
+            self.state.flush()
+
             # 顯示摘要
             self._print_summary()
 
+            # 寫出剩餘日誌並停止背景寫入執行緒
+            self.logger.close()
+
+    def _mark_saved(self):
+        """
+        將已寫入檔案的貼文標記為已處理
+
+        single_writer 模式下 save_post 只把貼文放入暫存；在寫入檔案之前標記，
+        中斷時這些貼文會遺失卻被視為已處理，之後永遠被去重跳過。
+        """
+        for post_id in self.saver.take_written_ids():
+            self._staged_ids.discard(post_id)
+            if post_id is not None:
+                self.state.mark_processed(post_id, self.session_id)
+
     def _print_config(self):
         """顯示配置資訊"""
         self.logger.info("配置資訊:")
@@ -166,15 +214,29 @@ class FacebookScraper:
             self.logger.info("✅ 已登入 Facebook")
             return True
 
-        else:
-            self.logger.warning("⚠️  未登入 Facebook")
-            self.logger.info("")
-            self.logger.info("請在瀏覽器中手動登入 Facebook，然後按 Enter 繼續...")
+        if self.config.headless:
+            # 頁面可能仍在載入或跳轉，先短暫等待使用者選單再判定
+            if self.browser.wait_for_login(timeout=10000) and self.browser.is_logged_in():
+                self.logger.info("✅ 已登入 Facebook")
+                return True
 
-            try:
-                input()
+            # 無頭模式無法手動登入，直接失敗 (避免無人值守時卡住)
+            self.logger.error("❌ 未登入 Facebook，無頭模式無法手動登入")
+            self.logger.error(f"請先以非無頭模式登入一次，Cookies 會儲存到 {self.config.cookies_path}")
+            return False
+
+        self.logger.warning("⚠️  未登入 Facebook")
+        self.logger.info("")
+        self.logger.info("請在瀏覽器中手動登入 Facebook (最多等待 5 分鐘)...")
 
-                # 再次檢查
+        try:
+            # 每次最多等待使用者選單 5 秒 (由 Playwright 等待，route handler 持續處理請求)，
+            # 不需要回到終端機按 Enter；每次等待之間檢查中斷信號
+            for _ in range(60):
+                if not self.is_running:
+                    return False
+
+                self.browser.wait_for_login(timeout=5000)
                 if self.browser.is_logged_in():
                     self.logger.info("✅ 登入成功")
 
@@ -183,13 +245,13 @@ class FacebookScraper:
                     self.logger.info(f"✅ Cookies 已儲存: {self.config.cookies_path}")
 
                     return True
-                else:
-                    self.logger.error("❌ 仍未登入，無法繼續")
-                    return False
 
-            except Exception as e:
-                self.logger.error(f"登入處理失敗: {e}", exc_info=True)
-                return False
+            self.logger.error("❌ 等待逾時，仍未登入，無法繼續")
+            return False
+
+        except Exception as e:
+            self.logger.error(f"登入處理失敗: {e}", exc_info=True)
+            return False
 
     def _scraping_loop(self):
         """
@@ -204,19 +266,33 @@ class FacebookScraper:
         self.logger.info(f"目標: 抓取 {max_posts} 則新貼文")
         self.logger.separator()
 
-        while processed_count < max_posts and self.is_running:
-            # 1. 提取當前頁面的貼文
-            posts = self.extractor.extract_posts(self.browser.page)
+        # 1. 提取當前頁面的貼文 (一次 page.evaluate，已過濾留言與過短貼文)
+        #    之後每一輪的貼文由步驟 3 的滾動一併提取
+        posts = self.extractor.extract_posts_data(self.browser.page)
 
+        while processed_count < max_posts and self.is_running:
             if not posts:
                 self.logger.warning("未找到貼文元素，可能頁面未載入完成")
-                time.sleep(2)
+                # 只在異常情況發生，保留固定間隔避免連續重試
+                # (以 Playwright 等待，期間 route handler 仍會處理請求)
+                self.browser.page.wait_for_timeout(2000)
+                posts = self.extractor.extract_posts_data(self.browser.page)
                 continue
 
-            self.logger.info(f"頁面上找到 {len(posts)} 個 article 元素")
+            self.logger.info(f"頁面上找到 {len(posts)} 則貼文")
+
+            # 2. 處理每一則貼文 (整頁一次去重)
+            new_ids = self.state.unprocessed([p['id'] for p in posts]) - self._staged_ids
+            page_skipped = 0
+            page_failed = 0
 
-            # 2. 處理每一則貼文
-            for i, post_elem in enumerate(posts):
+            # 穩定狀態 (整頁都已處理過) 不需要逐則檢查，直接滾動
+            if not new_ids:
+                self.logger.debug("整頁 %d 則貼文皆已處理過，直接滾動", len(posts))
+                page_skipped = len(posts)
+                posts = ()
+
+            for i, post_data in enumerate(posts):
                 if processed_count >= max_posts:
                     break
 
@@ -224,29 +300,22 @@ class FacebookScraper:
                     break
 
                 try:
-                    # 提取貼文資料
-                    post_data = self.extractor.extract_post_data(post_elem)
-
-                    if not post_data:
-                        self.logger.debug(f"元素 {i+1}: 提取失敗或被過濾，跳過")
-                        # 注意：這可能是留言、文本太短、或其他原因
-                        continue
-
                     post_id = post_data['id']
 
                     # 檢查是否已處理過 (去重)
-                    if self.state.is_processed(post_id):
-                        self.logger.debug(f"貼文 {i+1}: {post_id} 已處理過，跳過")
-                        self.state.mark_skipped(self.session_id)
-                        skipped_count += 1
+                    if post_id not in new_ids:
+                        self.logger.debug("貼文 %d: %s 已處理過，跳過", i + 1, post_id)
+                        page_skipped += 1
                         continue
+                    new_ids.discard(post_id)  # 同一頁重複出現時只處理一次
 
                     # 儲存貼文
                     save_result = self.saver.save_post(post_data)
 
                     if save_result['success']:
-                        # 標記為已處理
-                        self.state.mark_processed(post_id, self.session_id)
+                        # 寫入檔案後才標記為已處理 (暫存中的貼文等寫入後再標記)
+                        self._staged_ids.add(post_id)
+                        self._mark_saved()
                         processed_count += 1
 
                         # 顯示進度
@@ -258,19 +327,28 @@ class FacebookScraper:
 
                     else:
                         self.logger.error(f"❌ 儲存失敗: {save_result.get('error')}")
-                        self.state.mark_failed(self.session_id)
-                        failed_count += 1
+                        page_failed += 1
 
                 except Exception as e:
                     self.logger.error(f"處理貼文時出錯: {e}", exc_info=True)
-                    self.state.mark_failed(self.session_id)
-                    failed_count += 1
-
-            # 3. 滾動載入更多
+                    page_failed += 1
+
+            # 跳過與失敗計數每頁寫入一次
+            if page_skipped:
+                self.state.mark_skipped(n=page_skipped)
+                skipped_count += page_skipped
+            if page_failed:
+                self.state.mark_failed(n=page_failed)
+                failed_count += page_failed
+
+            # 3. 滾動載入更多，並在同一次 page.evaluate 中提取下一輪的貼文
+            #    (滾動後在瀏覽器內至少等待隨機滾動延遲，新貼文出現即提取，最多再等 2 秒)
             if processed_count < max_posts and self.is_running:
                 self.logger.info("滾動載入更多貼文...")
 
-                has_new_content = self.browser.scroll_to_bottom()
+                posts, has_new_content = self.extractor.scroll_and_extract(
+                    self.browser.page, self.browser.next_scroll_delay()
+                )
 
                 if not has_new_content:
                     no_new_content_count += 1
@@ -282,9 +360,6 @@ class FacebookScraper:
                 else:
                     no_new_content_count = 0  # 重置計數
 
-                # 等待新內容載入
-                time.sleep(2)
-
         # 結束提示
         self.logger.separator()
         self.logger.info(f"本次爬取結束:")
@@ -345,7 +420,7 @@ def main():
 
         # 覆蓋 headless 設定
         if args.headless:
-            scraper.config.data['scraper']['headless'] = True
+            scraper.config.set('scraper.headless', True)
 
         scraper.run()
 
@@ -6,14 +6,89 @@
 - Session 管理 (開始、結束、統計)
 - 已處理貼文 ID 追蹤 (去重)
 - 狀態持久化 (斷點續傳)
+
+持久化方式: 完整狀態 (快照) 寫入 JSON，兩次快照之間的每個操作
+只附加一行到 .wal 檔 (write-ahead log)；載入時先讀快照再重播 WAL。
+已處理的貼文 ID 不放在 JSON 中，快照時只把新增的部分附加到
+.ids.jsonl.gz (gzip 壓縮的 JSONL)，JSON 只保留 sessions 與 metadata。
+.ids.jsonl.gz 在第一次需要完整 ID 列表時才載入 (Bloom filter 已同步時啟動不必讀取)。
 """
 
+import atexit
+import bisect
+import gzip
+import hashlib
+import itertools
 import json
+import logging
 import os
-from datetime import datetime
+import pickle
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from bloom import ScalableBloomFilter, StableBloomFilter
+
+try:
+    import orjson  # 選用：較快的 JSON 序列化/解析
+except ImportError:
+    orjson = None
+
+try:
+    import xxhash  # 選用：較快的 64 位元雜湊
+except ImportError:
+    xxhash = None
+
+
+def _dumps(obj, indent: bool = False) -> bytes:
+    """序列化為 UTF-8 JSON (有 orjson 時使用 orjson)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+# 與 ScraperLogger 共用的 logger
+_logger = logging.getLogger('scraper')
+
+
+def _id_key(post_id: str) -> int:
+    """
+    貼文 ID 轉為 64 位元整數
+
+    精確集合只存整數 (比長字串省記憶體、比較更快)；只存在記憶體中，
+    不寫入檔案，因此有無 xxhash 產生的值不同也沒有關係。
+    """
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(post_id)
+    return int.from_bytes(hashlib.blake2b(post_id.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _atomic_write(path: Path, data: bytes):
+    """
+    以「寫入暫存檔 → fsync → os.replace」取代原檔
+
+    中斷時原檔保持完整 (不會出現寫到一半的檔案)。
+
+    Args:
+        path (Path): 目標檔案
+        data (bytes): 檔案內容
+    """
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _iso_to_ns(value: str) -> int:
+    """ISO 格式時間 (本地時間) 轉為 time.time_ns() 格式的整數"""
+    return round(datetime.fromisoformat(value).timestamp() * 1_000_000) * 1000
+
 
 class StateManager:
     """
@@ -28,19 +103,73 @@ class StateManager:
         state.end_session(session_id, 'completed')
     """
 
-    def __init__(self, state_file='state/scraper_state.json'):
+    # 每 N 個 WAL 記錄寫一次快照 (並清空 WAL)
+    SNAPSHOT_EVERY = 500
+
+    # WAL 緩衝: 累積 N 筆或超過 T 秒才寫到檔案
+    FLUSH_EVERY = 50
+    FLUSH_INTERVAL = 5.0
+
+    # 固定記憶體模式下精確比對的近期 ID 數量
+    RECENT_IDS = 10000
+
+    def __init__(self, state_file='state/scraper_state.json', bounded: bool = False):
         """
         初始化狀態管理器
 
         Args:
             state_file (str): 狀態檔案路徑
+            bounded (bool): 固定記憶體去重 (Stable Bloom filter + 近期 ID)，適合長時間執行。
+                代價有兩種: 很久以前處理過的貼文可能被再處理一次；
+                不在近期 ID 中的新貼文若被 Bloom filter 誤判 (約 1e-4)，
+                會被視為已處理而永久跳過 (只留下 debug 日誌)
         """
         self.state_file = Path(state_file)
+        self._bounded = bounded
         self.state_file.parent.mkdir(parents=True, exist_ok=True)
         self.state = self._load_or_create()
-        self._processed_ids_cache = set(
-            p['id'] for p in self.state['processed_post_ids']
-        )
+
+        # 已處理的貼文 (三個等長列表，session_idx 指向 _session_ids)
+        # 第一次需要完整列表時才載入 .ids.jsonl.gz (見 _columns)，載入前新增的 ID 暫存在 _tail
+        self._ids_file = self.state_file.with_suffix('.ids.jsonl.gz')
+        self._processed = None
+        self._session_ids = None
+        self._tail = []
+        migrated = 'processed' in self.state
+        if migrated:
+            self._take_legacy_processed()
+        else:
+            self._truncate_ids()
+
+        # session_id → session (與 state['sessions'] 中為同一個 dict)
+        # session_id 重複時 (同一秒內開始) 指向較新的 session
+        self._session_index = {s['session_id']: s for s in self.state['sessions']}
+
+        # 重播快照之後的 WAL 記錄，再開啟 WAL 供後續附加
+        self._wal_file = self.state_file.with_suffix('.wal')
+        self._wal_seq = self.state['metadata'].get('wal_seq', 0)
+        self._wal_pending = self._replay_wal()
+        self._wal = open(self._wal_file, 'ab')
+        self._dirty = 0
+        self._last_flush = time.monotonic()
+
+        # 2.x 版狀態檔: 立即寫入快照，已處理 ID 移到 .ids.jsonl.gz
+        if migrated:
+            self.save_snapshot()
+
+        # 程式結束時寫入快照 (包含尚在緩衝區的記錄)
+        atexit.register(self.close)
+
+        # 成員檢查: Bloom filter 先過濾，回答「可能已處理」時才以精確集合確認
+        # 精確集合在第一次需要時才建立
+        # 固定記憶體模式: 不建立精確集合，只精確比對最近 RECENT_IDS 個 ID
+        self._bloom_file = self.state_file.with_suffix('.bloom')
+        self._bloom = self._load_bloom()
+        self._processed_ids_cache = None
+        self._recent = self._build_recent()
+
+        # 目前進行中的 session (start_session 設定，mark_* 未指定 session_id 時使用)
+        self._current_session: Optional[Dict] = None
 
     def _load_or_create(self) -> Dict:
         """
@@ -50,26 +179,378 @@ class StateManager:
             Dict: 狀態資料
         """
         if self.state_file.exists():
-            with open(self.state_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(self.state_file, 'rb') as f:
+                state = _loads(f.read())
+
+            if state.get('version') == '1.0':
+                state = self._migrate_v1(state)
+            if state.get('version') == '2.0':
+                state = self._migrate_v2(state)
+            return state
         else:
             return {
-                'version': '1.0',
+                'version': '3.0',
                 'sessions': [],
-                'processed_post_ids': [],
+                # 已處理的貼文存在 .ids.jsonl.gz，ids_bytes / ids_count 為快照時該檔的大小與筆數
                 'metadata': {
                     'created_at': datetime.now().isoformat(),
                     'last_updated': datetime.now().isoformat(),
-                    'total_all_time': 0
+                    'total_all_time': 0,
+                    'ids_bytes': 0,
+                    'ids_count': 0
                 }
             }
 
+    @staticmethod
+    def _migrate_v1(state: Dict) -> Dict:
+        """
+        將 1.0 版狀態 (processed_post_ids 為 dict 列表) 轉換為 2.0 版欄位格式
+
+        Args:
+            state (Dict): 1.0 版狀態
+
+        Returns:
+            Dict: 2.0 版狀態
+        """
+        session_ids = []
+        session_index = {}
+        processed = {'ids': [], 'processed_at': [], 'session_idx': []}
+
+        for p in state.pop('processed_post_ids'):
+            idx = session_index.get(p['session_id'])
+            if idx is None:
+                idx = session_index[p['session_id']] = len(session_ids)
+                session_ids.append(p['session_id'])
+
+            processed['ids'].append(p['id'])
+            processed['processed_at'].append(p['processed_at'])
+            processed['session_idx'].append(idx)
+
+        state['version'] = '2.0'
+        state['processed'] = processed
+        state['session_ids'] = session_ids
+        return state
+
+    @staticmethod
+    def _migrate_v2(state: Dict) -> Dict:
+        """
+        將 2.0 版狀態 (processed_at 為 ISO 字串) 轉換為 2.1 版 (time_ns 整數)
+
+        Args:
+            state (Dict): 2.0 版狀態
+
+        Returns:
+            Dict: 2.1 版狀態
+        """
+        processed = state['processed']
+        processed['processed_at'] = [_iso_to_ns(ts) for ts in processed['processed_at']]
+        state['version'] = '2.1'
+        return state
+
+    def _take_legacy_processed(self):
+        """
+        取出 2.x 版嵌在 JSON 中的已處理 ID 欄位 (轉換為 3.0 版)
+
+        .ids.jsonl.gz 視為空檔 (可能是上次轉換中斷留下的)，
+        下一次快照時寫入全部 ID。
+        """
+        self._processed = self.state.pop('processed')
+        self._session_ids = self.state.pop('session_ids')
+        self.state['version'] = '3.0'
+
+        open(self._ids_file, 'wb').close()
+        self._ids_bytes = 0
+        self._ids_persisted = 0
+
+    def _truncate_ids(self):
+        """
+        截掉 .ids.jsonl.gz 超過快照記錄大小 (ids_bytes) 的部分
+
+        超過的部分是寫入快照前中斷留下的，由 WAL 重播補回，不會重複。
+        檔案大小與快照一致時直接採用快照記錄的筆數，不必讀取檔案。
+        """
+        metadata = self.state['metadata']
+        self._ids_bytes = 0
+        if self._ids_file.exists():
+            self._ids_bytes = min(self._ids_file.stat().st_size, metadata.get('ids_bytes', 0))
+            with open(self._ids_file, 'r+b') as f:
+                f.truncate(self._ids_bytes)
+
+        self._ids_persisted = metadata.get('ids_count')
+        if self._ids_persisted is None or self._ids_bytes != metadata.get('ids_bytes', 0):
+            # 沒有筆數記錄或檔案比快照記錄的小: 串流讀取檔案取得實際筆數 (不建立欄位)
+            self._ids_persisted = 0
+            if self._ids_file.exists():
+                with gzip.open(self._ids_file, 'rb') as f:
+                    self._ids_persisted = sum(1 for _ in f)
+
+    def _load_processed(self):
+        """載入 .ids.jsonl.gz (多個 gzip member 串接，每行 [id, processed_at, session_id])"""
+        self._processed = {'ids': [], 'processed_at': [], 'session_idx': []}
+        self._session_ids = []
+
+        if self._ids_file.exists():
+            with gzip.open(self._ids_file, 'rb') as f:
+                for line in f:
+                    self._append_row(*_loads(line))
+
+        self._ids_persisted = len(self._processed['ids'])
+
+    def _columns(self) -> Dict:
+        """
+        完整的已處理 ID 欄位
+
+        第一次呼叫時載入 .ids.jsonl.gz，並併入載入前新增的 ID (_tail)。
+
+        Returns:
+            Dict: 三個等長列表 (ids, processed_at, session_idx)
+        """
+        if self._processed is None:
+            self._load_processed()
+            tail, self._tail = self._tail, []
+            for row in tail:
+                self._append_row(*row)
+        return self._processed
+
+    def _append_row(self, post_id: str, ts: int, session: str):
+        """新增一筆已處理 ID 到欄位 (session 與前一筆相同時共用 session_idx)"""
+        session_ids = self._session_ids
+        if not session_ids or session_ids[-1] != session:
+            session_ids.append(session)
+
+        processed = self._processed
+        processed['ids'].append(post_id)
+        processed['processed_at'].append(ts)
+        processed['session_idx'].append(len(session_ids) - 1)
+
+    def _processed_count(self) -> int:
+        """已處理 ID 的總筆數 (不需要載入 .ids.jsonl.gz)"""
+        if self._processed is None:
+            return self._ids_persisted + len(self._tail)
+        return len(self._processed['ids'])
+
+    def _rows(self, start: int) -> List:
+        """
+        第 start 筆之後的已處理 ID
+
+        Returns:
+            List: [id, processed_at, session_id] 列表
+        """
+        if self._processed is None:
+            if start >= self._ids_persisted:
+                return self._tail[start - self._ids_persisted:]
+            self._columns()
+
+        processed = self._processed
+        session_ids = self._session_ids
+        return [
+            (post_id, ts, session_ids[idx])
+            for post_id, ts, idx in zip(processed['ids'][start:],
+                                         processed['processed_at'][start:],
+                                         processed['session_idx'][start:])
+        ]
+
+    def _iter_rows(self, start: int = 0):
+        """
+        逐筆產生第 start 筆之後的已處理 ID ([id, processed_at, session_id])
+
+        欄位尚未載入時串流讀取 .ids.jsonl.gz 再接上 _tail，不建立完整列表。
+        """
+        if self._processed is not None:
+            yield from self._rows(start)
+            return
+
+        if start < self._ids_persisted and self._ids_file.exists():
+            with gzip.open(self._ids_file, 'rb') as f:
+                for line in itertools.islice(f, start, None):
+                    yield _loads(line)
+        yield from self._tail[max(0, start - self._ids_persisted):]
+
+    def _ids_lines(self, start: int) -> bytes:
+        """第 start 筆之後的已處理 ID，轉為 JSONL"""
+        return b''.join(_dumps(row) + b'\n' for row in self._rows(start))
+
+    def _append_ids(self):
+        """將上次快照之後新增的已處理 ID 附加到 .ids.jsonl.gz (一個 gzip member)"""
+        count = self._processed_count()
+        if self._ids_persisted >= count:
+            return
+
+        data = gzip.compress(self._ids_lines(self._ids_persisted), compresslevel=6, mtime=0)
+        with open(self._ids_file, 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._ids_bytes += len(data)
+        self._ids_persisted = count
+        self._tail.clear()
+
+    def _rewrite_ids(self):
+        """以目前的已處理 ID 重寫整個 .ids.jsonl.gz (清理舊資料後使用)"""
+        data = gzip.compress(self._ids_lines(0), compresslevel=6, mtime=0)
+        _atomic_write(self._ids_file, data)
+        self._ids_bytes = len(data)
+        self._ids_persisted = self._processed_count()
+
+    def _build_bloom(self):
+        """由已處理的 ID 重建 Bloom filter (串流讀取，不載入欄位)"""
+        if self._bounded:
+            bloom = StableBloomFilter(num_bits=2 ** 23, num_hashes=7, error_rate=1e-4)
+        else:
+            bloom = ScalableBloomFilter(initial_capacity=100000, error_rate=1e-7)
+        for row in self._iter_rows():
+            bloom.add(row[0])
+        bloom.synced = self._processed_count()
+        return bloom
+
+    def _load_bloom(self) -> ScalableBloomFilter:
+        """
+        載入 Bloom filter (.bloom)，不存在或無法使用時重建
+
+        Bloom filter 只在 save_bloom() 時寫入，可能落後於狀態檔；
+        已處理的 ID 只會在尾端新增，因此補加落後的部分即可。
+        落後的部分以串流讀取 (都在 WAL 重播的 ID 中時不必讀取 .ids.jsonl.gz)。
+
+        Returns:
+            ScalableBloomFilter: 與已處理 ID 同步的 Bloom filter
+        """
+        count = self._processed_count()
+
+        try:
+            with open(self._bloom_file, 'rb') as f:
+                bloom = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return self._build_bloom()
+
+        expected = StableBloomFilter if self._bounded else ScalableBloomFilter
+        if not isinstance(bloom, expected) or bloom.synced > count:
+            # 切換過 bounded 模式，或清理過舊資料後的舊檔案
+            return self._build_bloom()
+
+        for row in self._iter_rows(bloom.synced):
+            bloom.add(row[0])
+        bloom.synced = count
+        return bloom
+
+    def _build_recent(self) -> OrderedDict:
+        """
+        固定記憶體模式: 最近 RECENT_IDS 個已處理 ID (64 位元整數，依加入順序)
+
+        串流讀取 .ids.jsonl.gz，只保留最後 RECENT_IDS 筆，不載入欄位。
+        """
+        if not self._bounded:
+            return OrderedDict()
+        recent = deque((row[0] for row in self._iter_rows()), maxlen=self.RECENT_IDS)
+        return OrderedDict.fromkeys(map(_id_key, recent))
+
+    def save_bloom(self):
+        """儲存 Bloom filter 到 .bloom 檔案"""
+        _atomic_write(self._bloom_file, pickle.dumps(self._bloom, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def _replay_wal(self) -> int:
+        """
+        重播 WAL 中比快照新的記錄
+
+        每筆記錄帶有遞增的 seq，快照記錄寫入時的 wal_seq；
+        快照寫入後、WAL 清空前中斷時，舊記錄會依 seq 略過，不會重複套用。
+
+        Returns:
+            int: 重播的記錄數
+        """
+        if not self._wal_file.exists():
+            return 0
+
+        replayed = 0
+        with open(self._wal_file, 'rb') as f:
+            for line in f:
+                try:
+                    entry = _loads(line)
+                except ValueError:
+                    break  # 寫入中斷的最後一行
+
+                if entry['seq'] <= self._wal_seq:
+                    continue
+                self._wal_seq = entry['seq']
+                self._apply(entry)
+                replayed += 1
+
+        return replayed
+
+    def _apply(self, entry: Dict):
+        """將一筆 WAL 記錄套用到記憶體中的狀態"""
+        if entry['op'] == 'processed':
+            ts = entry['ts']
+            if isinstance(ts, str):
+                ts = _iso_to_ns(ts)
+            if self._processed is None:
+                self._tail.append((entry['id'], ts, entry['session']))
+            else:
+                self._append_row(entry['id'], ts, entry['session'])
+            self.state['metadata']['total_all_time'] += 1
+            self._update_session_stat(entry['session'], 'total_processed', 1)
+
+        elif entry['op'] == 'stat':
+            self._update_session_stat(entry['session'], entry['stat'], entry['n'])
+
+    def _log(self, entry: Dict):
+        """
+        附加一筆記錄到 WAL
+
+        記錄先留在檔案緩衝區，累積 FLUSH_EVERY 筆或距上次寫出超過
+        FLUSH_INTERVAL 秒才寫到檔案；累積 SNAPSHOT_EVERY 筆後寫入快照。
+
+        Args:
+            entry (Dict): 操作記錄 (不含 seq)
+        """
+        self._wal_seq += 1
+        entry['seq'] = self._wal_seq
+        self._wal.write(_dumps(entry) + b'\n')
+
+        self._wal_pending += 1
+        if self._wal_pending >= self.SNAPSHOT_EVERY:
+            self.save_snapshot()
+            return
+
+        self._dirty += 1
+        if (self._dirty >= self.FLUSH_EVERY
+                or time.monotonic() - self._last_flush > self.FLUSH_INTERVAL):
+            self.flush()
+
+    def flush(self):
+        """將緩衝中的 WAL 記錄寫到檔案"""
+        if self._dirty:
+            self._wal.flush()
+            self._dirty = 0
+        self._last_flush = time.monotonic()
+
     def save(self):
-        """儲存狀態到檔案"""
+        """儲存狀態到檔案 (完整快照；已處理 ID 只附加新增的部分)"""
+        self._append_ids()
+
         self.state['metadata']['last_updated'] = datetime.now().isoformat()
+        self.state['metadata']['wal_seq'] = self._wal_seq
+        self.state['metadata']['ids_bytes'] = self._ids_bytes
+        self.state['metadata']['ids_count'] = self._ids_persisted
+
+        _atomic_write(self.state_file, _dumps(self.state, indent=True))
 
-        with open(self.state_file, 'w', encoding='utf-8') as f:
-            json.dump(self.state, f, ensure_ascii=False, indent=2)
+    def save_snapshot(self):
+        """寫入完整快照並清空 WAL"""
+        self.save()
+        self._wal.flush()  # 先寫出緩衝區，避免清空後又寫入舊記錄
+        self._wal.truncate(0)
+        self._wal.seek(0)
+        self._wal_pending = 0
+        self._dirty = 0
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """寫入快照 (有未寫入快照的記錄時) 並關閉 WAL"""
+        if not self._wal.closed:
+            if self._wal_pending:
+                self.save_snapshot()
+            self._wal.close()
 
     def start_session(self) -> str:
         """
@@ -91,7 +572,9 @@ class StateManager:
         }
 
         self.state['sessions'].append(session)
-        self.save()
+        self._session_index[session_id] = session
+        self._current_session = session
+        self.save_snapshot()
 
         return session_id
 
@@ -103,13 +586,15 @@ class StateManager:
             session_id (str): Session ID
             status (str): 結束狀態 (completed, failed, interrupted)
         """
-        for session in self.state['sessions']:
-            if session['session_id'] == session_id:
-                session['end_time'] = datetime.now().isoformat()
-                session['status'] = status
-                break
+        session = self._session_index.get(session_id)
+        if session is not None:
+            session['end_time'] = datetime.now().isoformat()
+            session['status'] = status
+        if session is self._current_session:
+            self._current_session = None
 
-        self.save()
+        self.save_snapshot()
+        self.save_bloom()
 
     def is_processed(self, post_id: str) -> bool:
         """
@@ -121,54 +606,111 @@ class StateManager:
         Returns:
             bool: True 表示已處理
         """
-        return post_id in self._processed_ids_cache
+        if self._bounded:
+            # 近期的 ID 精確比對，較舊的只靠 Stable Bloom filter (無法排除誤判)
+            if _id_key(post_id) in self._recent:
+                return True
+            if post_id in self._bloom:
+                _logger.debug("貼文 %s 只因 Bloom filter 命中而視為已處理 (可能為誤判)", post_id)
+                return True
+            return False
+
+        # 大多數新貼文在這裡就確定未處理
+        if post_id not in self._bloom:
+            return False
+
+        # 可能已處理 → 以精確集合確認 (排除誤判)
+        return _id_key(post_id) in self._exact_ids()
+
+    def unprocessed(self, post_ids: List[str]) -> set:
+        """
+        一次找出尚未處理的貼文 ID
+
+        Args:
+            post_ids (List[str]): 貼文 ID 列表 (例如同一頁的所有貼文)
 
-    def mark_processed(self, post_id: str, session_id: str):
+        Returns:
+            set: 尚未處理的 ID
+        """
+        new_ids = set(post_ids)
+        if self._bounded:
+            return {post_id for post_id in new_ids if not self.is_processed(post_id)}
+
+        bloom = self._bloom
+        maybe = [post_id for post_id in new_ids if post_id in bloom]
+        if maybe:
+            exact = self._exact_ids()
+            new_ids.difference_update(post_id for post_id in maybe if _id_key(post_id) in exact)
+        return new_ids
+
+    def _exact_ids(self) -> set:
+        """已處理 ID 的精確集合 (64 位元整數，第一次需要時才建立)"""
+        if self._processed_ids_cache is None:
+            self._processed_ids_cache = set(map(_id_key, self._columns()['ids']))
+        return self._processed_ids_cache
+
+    def _session_id(self, session_id: Optional[str]) -> str:
+        """未指定 session_id 時使用目前進行中的 session"""
+        if session_id is not None:
+            return session_id
+        if self._current_session is None:
+            raise RuntimeError("沒有進行中的 session，請先呼叫 start_session() 或指定 session_id")
+        return self._current_session['session_id']
+
+    def mark_processed(self, post_id: str, session_id: Optional[str] = None):
         """
         標記貼文為已處理
 
         Args:
             post_id (str): 貼文 ID
-            session_id (str): Session ID
+            session_id (str, optional): Session ID (預設為目前進行中的 session)
         """
         if not self.is_processed(post_id):
-            # 添加到狀態
-            self.state['processed_post_ids'].append({
+            entry = {
+                'op': 'processed',
                 'id': post_id,
-                'processed_at': datetime.now().isoformat(),
-                'session_id': session_id
-            })
-
-            # 更新快取
-            self._processed_ids_cache.add(post_id)
-
-            # 更新總計
-            self.state['metadata']['total_all_time'] += 1
-
-            # 更新 session 統計
-            self._update_session_stat(session_id, 'total_processed', 1)
+                'session': self._session_id(session_id),
+                'ts': time.time_ns()
+            }
 
-            self.save()
+            # 添加到狀態 (含總計與 session 統計)
+            self._apply(entry)
 
-    def mark_failed(self, session_id: str):
+            # 更新快取
+            self._bloom.add(post_id)
+            self._bloom.synced += 1
+            if self._processed_ids_cache is not None:
+                self._processed_ids_cache.add(_id_key(post_id))
+            if self._bounded:
+                self._recent[_id_key(post_id)] = None
+                if len(self._recent) > self.RECENT_IDS:
+                    self._recent.popitem(last=False)
+
+            self._log(entry)
+
+    def mark_failed(self, session_id: Optional[str] = None, n: int = 1):
         """
         增加失敗計數
 
         Args:
-            session_id (str): Session ID
+            session_id (str, optional): Session ID (預設為目前進行中的 session)
+            n (int): 失敗的貼文數 (整頁一次計入)
         """
-        self._update_session_stat(session_id, 'total_failed', 1)
-        self.save()
+        entry = {'op': 'stat', 'session': self._session_id(session_id), 'stat': 'total_failed', 'n': n}
+        self._apply(entry)
+        self._log(entry)
 
-    def mark_skipped(self, session_id: str):
+    def mark_skipped(self, session_id: Optional[str] = None, n: int = 1):
         """
         增加跳過計數 (已處理過的貼文)
 
         Args:
-            session_id (str): Session ID
+            session_id (str, optional): Session ID (預設為目前進行中的 session)
+            n (int): 跳過的貼文數 (整頁一次計入)
         """
-        self._update_session_stat(session_id, 'total_skipped', 1)
-        self.save()
+        entry = {'op': 'stat', 'session': self._session_id(session_id), 'stat': 'total_skipped', 'n': n}
+        self._apply(entry)
+        self._log(entry)
 
     def _update_session_stat(self, session_id: str, stat_name: str, increment: int = 1):
         """
@@ -179,10 +721,9 @@ class StateManager:
             stat_name (str): 統計項目名稱
             increment (int): 增加數量
         """
-        for session in self.state['sessions']:
-            if session['session_id'] == session_id:
-                session[stat_name] += increment
-                break
+        session = self._session_index.get(session_id)
+        if session is not None:  # WAL 重播時 session 可能已被清理
+            session[stat_name] += increment
 
     def get_stats(self) -> Dict:
         """
@@ -209,10 +750,7 @@ class StateManager:
         Returns:
             Optional[Dict]: Session 資料，若不存在則為 None
         """
-        for session in self.state['sessions']:
-            if session['session_id'] == session_id:
-                return session
-        return None
+        return self._session_index.get(session_id)
 
     def cleanup_old_data(self, keep_days: int = 30):
         """
@@ -221,29 +759,45 @@ class StateManager:
         Args:
             keep_days (int): 保留天數
         """
-        from datetime import timedelta
-
         cutoff_date = datetime.now() - timedelta(days=keep_days)
         cutoff_str = cutoff_date.isoformat()
-
-        # 清理舊的 processed_post_ids
-        self.state['processed_post_ids'] = [
-            p for p in self.state['processed_post_ids']
-            if p['processed_at'] >= cutoff_str
-        ]
-
-        # 清理舊的 sessions
-        self.state['sessions'] = [
-            s for s in self.state['sessions']
-            if s['start_time'] >= cutoff_str
-        ]
+        cutoff_ns = time.time_ns() - keep_days * 86400 * 10**9
+
+        # 先寫入快照 (清空 WAL)，重寫 .ids.jsonl.gz 時中斷也不會重播出重複的 ID
+        self.save_snapshot()
+
+        # 清理舊的已處理 ID (processed_at 依時間遞增，二分搜尋切點)
+        processed = self._columns()
+        cut = bisect.bisect_left(processed['processed_at'], cutoff_ns)
+        for column in processed.values():
+            del column[:cut]
+        if cut:
+            self._rewrite_ids()
+
+        # 清理舊的 sessions (依開始時間遞增；bisect 的 key 參數需要 Python 3.10，手動二分搜尋)
+        sessions = self.state['sessions']
+        lo, hi = 0, len(sessions)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if sessions[mid]['start_time'] < cutoff_str:
+                lo = mid + 1
+            else:
+                hi = mid
+        del sessions[:lo]
+        self._session_index = {s['session_id']: s for s in sessions}
 
         # 重建快取
-        self._processed_ids_cache = set(
-            p['id'] for p in self.state['processed_post_ids']
-        )
+        self._bloom = self._build_bloom()
+        self._processed_ids_cache = None
+        self._recent = self._build_recent()
 
-        self.save()
+        self.save_snapshot()
+        self.save_bloom()
+
+        # 固定記憶體模式: 欄位只在清理時使用，清理後釋放 (之後新增的 ID 只暫存在 _tail)
+        if self._bounded:
+            self._processed = None
+            self._session_ids = None
 
 
 # 測試程式碼
@@ -273,6 +827,9 @@ if __name__ == '__main__':
     assert sm.is_processed('test_post_999') == False
     print("✅ test_post_999 未處理")
 
+    assert sm.unprocessed(['test_post_001', 'test_post_999', 'test_post_999']) == {'test_post_999'}
+    print("✅ 批次檢查正確")
+
     # 測試 4: 重複標記 (應該不會增加計數)
     print("\n[測試 4] 重複標記")
     sm.mark_processed('test_post_001', session_id)  # 重複
@@ -283,7 +840,7 @@ if __name__ == '__main__':
     # 測試 5: 失敗和跳過計數
     print("\n[測試 5] 失敗和跳過計數")
     sm.mark_failed(session_id)
-    sm.mark_skipped(session_id)
+    sm.mark_skipped()  # 預設為目前進行中的 session
     session = sm.get_session(session_id)
     assert session['total_failed'] == 1
     assert session['total_skipped'] == 1
@@ -313,5 +870,95 @@ if __name__ == '__main__':
     assert sm2.get_stats()['total_all_time'] == 3
     print("✅ 狀態成功持久化並重新載入")
 
+    # 測試 9: 未結束 session 時中斷 (只有 WAL)，重新載入後重播並補齊 Bloom filter
+    print("\n[測試 9] WAL 重播與 Bloom filter 補齊")
+    session_id = sm2.start_session()
+    sm2.mark_processed('test_post_004', session_id)  # 未呼叫 end_session，只寫入 WAL
+    sm2.mark_skipped(session_id)
+    sm2.flush()
+    sm2._wal.close()  # 模擬中斷 (不寫入快照)
+    sm3 = StateManager('test_state/test_state.json')
+    assert sm3.is_processed('test_post_004') == True
+    assert sm3.is_processed('test_post_999') == False
+    assert sm3.get_stats()['total_all_time'] == 4
+    assert sm3.get_session(session_id)['total_skipped'] == 1
+    print("✅ 重新載入後重播 WAL 並補齊落後的 ID")
+
+    # 測試 10: 快照後 WAL 清空，不會重複套用
+    print("\n[測試 10] 快照")
+    sm3.close()
+    sm4 = StateManager('test_state/test_state.json')
+    assert sm4.get_stats()['total_all_time'] == 4
+    assert sm4.get_session(session_id)['total_skipped'] == 1
+    print("✅ 快照後重新載入，記錄沒有重複")
+
+    # Bloom filter 已同步時不載入 .ids.jsonl.gz，第一次需要精確確認時才載入
+    sm4.save_bloom()
+    sm4b = StateManager('test_state/test_state.json')
+    assert sm4b._processed is None
+    assert sm4b.is_processed('test_post_999') == False and sm4b._processed is None
+    assert sm4b.is_processed('test_post_001') == True and len(sm4b._processed['ids']) == 4
+    print("✅ 已處理 ID 延遲載入")
+
+    # 測試 11: 1.0 版狀態檔轉換
+    print("\n[測試 11] 1.0 版狀態檔轉換")
+    with open('test_state/test_state_v1.json', 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': '1.0',
+            'sessions': [],
+            'processed_post_ids': [
+                {'id': 'old_001', 'processed_at': '2020-01-01T00:00:00', 'session_id': 's1'},
+                {'id': 'old_002', 'processed_at': datetime.now().isoformat(), 'session_id': 's2'},
+            ],
+            'metadata': {'created_at': '2020-01-01T00:00:00', 'last_updated': '2020-01-01T00:00:00',
+                         'total_all_time': 2}
+        }, f)
+    sm5 = StateManager('test_state/test_state_v1.json')
+    assert sm5.state['version'] == '3.0' and 'processed' not in sm5.state
+    assert isinstance(sm5._processed['processed_at'][0], int)
+    assert sm5.is_processed('old_001') and sm5.is_processed('old_002')
+    sm5.cleanup_old_data(keep_days=30)
+    assert not sm5.is_processed('old_001') and sm5.is_processed('old_002')
+    sm6 = StateManager('test_state/test_state_v1.json')
+    assert sm6._columns()['ids'] == ['old_002'] and sm6._session_ids == ['s2']
+    print("✅ 轉換為 3.0 版 (ID 移到 .ids.jsonl.gz)，清理舊資料正確")
+
+    # 測試 12: 寫入快照前中斷，.ids.jsonl.gz 多出的部分被截掉，由 WAL 補回
+    print("\n[測試 12] .ids.jsonl.gz 截斷")
+    sm6.mark_processed('new_001', 's3')
+    sm6.flush()
+    sm6._append_ids()  # 模擬: 已附加 ID 但 JSON 快照尚未寫入
+    sm6._wal.close()    # 模擬中斷 (不寫入快照)
+    sm7 = StateManager('test_state/test_state_v1.json')
+    assert sm7._columns()['ids'] == ['old_002', 'new_001']
+    assert sm7.get_stats()['total_all_time'] == 3
+    print("✅ 截掉未寫入快照的部分，WAL 重播後沒有重複")
+
+
+    # 測試 13: 固定記憶體模式 (Stable Bloom filter + 近期 ID)
+    print("\n[測試 13] 固定記憶體模式")
+    sm8 = StateManager('test_state/test_state.json', bounded=True)
+    assert isinstance(sm8._bloom, StableBloomFilter)
+    assert sm8.is_processed('test_post_001') and not sm8.is_processed('test_post_999')
+    sm8.mark_processed('test_post_005', session_id)
+    assert sm8.unprocessed(['test_post_005', 'test_post_999']) == {'test_post_999'}
+    assert sm8._processed_ids_cache is None and len(sm8._recent) == 5
+    assert sm8._processed is None  # 不載入 .ids.jsonl.gz 的欄位
+    print("✅ 不建立精確集合，近期 ID 與 Stable Bloom filter 判斷正確")
+
+    # 已有 .ids.jsonl.gz 時以固定記憶體模式啟動: 串流讀取，不建立欄位，新增的 ID 只暫存到快照為止
+    sm8.close()
+    sm9 = StateManager('test_state/test_state.json', bounded=True)
+    assert sm9._processed is None and len(sm9._recent) == 5
+    for i in range(20):
+        sm9.mark_processed(f'bounded_{i:03d}', session_id)
+    assert sm9._processed is None and len(sm9._tail) == 20
+    sm9.save_snapshot()
+    assert sm9._processed is None and sm9._tail == []
+    assert sm9.is_processed('bounded_000') and sm9.is_processed('test_post_001')
+    sm9.cleanup_old_data(keep_days=30)
+    assert sm9._processed is None and sm9.is_processed('bounded_019')
+    assert sm9._processed_count() == 25
+    print("✅ 固定記憶體模式不載入欄位，清理後釋放")
     print("\n✅ 所有測試通過！")
     print(f"狀態檔案: test_state/test_state.json")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+PostExtractor 後處理效能量測
+(不需要瀏覽器)
+
+以固定的 _EXTRACT_JS 原始資料 (模擬 page.evaluate 的回傳值) 重複執行
+extract_posts_data，量測 Python 端後處理的吞吐量。
+可分別以 CPython 與 PyPy 執行比較 (PyPy 需要數輪暖身讓 JIT 生效):
+
+    python3 tests/bench_extractor.py
+    pypy3 tests/bench_extractor.py --rounds 50
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# 加入 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from extractor import make_extractor
+
+
+def make_fixtures(count: int) -> list:
+    """
+    產生模擬的貼文原始資料 (涵蓋 URL ID、屬性 ID、內容 hash、留言、過短文本)
+
+    Args:
+        count (int): 貼文數量
+
+    Returns:
+        list: _EXTRACT_JS 格式的原始資料
+    """
+    body = '台北市大安區 套房出租，近捷運站，月租 15000 元，可養寵物。' * 8
+    fixtures = []
+
+    for i in range(count):
+        kind = i % 5
+        raw = {
+            'text': f'{body} #{i}',
+            'href': None,
+            'idAttrs': [None, None, None],
+            'time': {'utime': str(1700000000 + i), 'datetime': None, 'title': None},
+            'author': f'作者 {i}',
+        }
+
+        if kind == 0:
+            raw['href'] = f'/groups/123/permalink/{10_000_000_000 + i}/?__cft__=abc'
+        elif kind == 1:
+            raw['href'] = f'https://www.facebook.com/groups/123/posts/{10_000_000_000 + i}?ref=x'
+        elif kind == 2:
+            raw['idAttrs'] = [None, f'post_{10_000_000_000 + i}', None]
+            raw['time'] = {'utime': None, 'datetime': '2024-01-01T00:00:00', 'title': None}
+        elif kind == 3:
+            raw['href'] = f'/groups/123/posts/{i}/?comment_id=1'  # 留言
+        else:
+            raw['time'] = None  # 內容 hash ID
+
+        fixtures.append(raw)
+
+    fixtures.append({'text': '短', 'href': None, 'idAttrs': [None, None, None],
+                     'time': None, 'author': None})
+    return fixtures
+
+
+class FakePage:
+    """只實作 evaluate 的假 Page，直接返回固定資料"""
+
+    def __init__(self, fixtures: list):
+        self.fixtures = fixtures
+
+    def evaluate(self, expression, arg=None):
+        return self.fixtures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PostExtractor 後處理效能量測')
+    parser.add_argument('--posts', type=int, default=1000, help='每頁貼文數 (預設: 1000)')
+    parser.add_argument('--rounds', type=int, default=20, help='量測輪數 (預設: 20)')
+    parser.add_argument('--warmup', type=int, default=5, help='暖身輪數 (預設: 5)')
+    args = parser.parse_args()
+
+    logger = logging.getLogger('bench_extractor')
+    logger.setLevel(logging.INFO)  # DEBUG 訊息不格式化
+    extractor = make_extractor(logger)
+    page = FakePage(make_fixtures(args.posts))
+
+    print("=" * 60)
+    print(f"PostExtractor 效能量測 ({sys.implementation.name} {sys.version.split()[0]})")
+    print("=" * 60)
+
+    for _ in range(args.warmup):
+        extractor.extract_posts_data(page)
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        posts = extractor.extract_posts_data(page)
+    elapsed = time.perf_counter() - start
+
+    total = args.rounds * len(page.fixtures)
+    print(f"有效貼文: {len(posts)} / {len(page.fixtures)} 則")
+    print(f"總耗時: {elapsed:.3f} 秒 ({args.rounds} 輪)")
+    print(f"吞吐量: {total / elapsed:,.0f} 則/秒")
+    print(f"平均: {elapsed / total * 1e6:.2f} µs/則")
+
+
+if __name__ == '__main__':
+    main()